@@ -0,0 +1,186 @@
+import glob
+import os
+import threading
+from collections import OrderedDict
+
+import pygame
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Folders searched, in order, for images, fonts and music
+IMAGE_DIRS = (BASE_DIR, os.path.join(BASE_DIR, "assets", "images"))
+FONT_DIRS = (BASE_DIR, os.path.join(BASE_DIR, "assets", "fonts"))
+MUSIC_DIR = os.path.join(BASE_DIR, "assets", "sounds", "Music")
+CACHE_DIR = os.path.join(
+    os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+    or os.path.join(os.path.expanduser("~"), ".cache"),
+    "snake-game",
+)
+
+# pygame < 2.1.3 only has the older names
+_tobytes = getattr(pygame.image, "tobytes", None) or pygame.image.tostring
+_frombytes = getattr(pygame.image, "frombytes", None) or pygame.image.fromstring
+
+
+def find(name, folders):
+    for folder in folders:
+        path = os.path.join(folder, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def scale_to_square(img, size):
+    """Fit ``img`` into a transparent size x size square, keeping its aspect."""
+    rect = img.get_rect()
+    factor = min(size / rect.width, size / rect.height)
+    width, height = int(rect.width * factor), int(rect.height * factor)
+    img = pygame.transform.smoothscale(img, (width, height))
+    surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    surface.blit(img, ((size - width) // 2, (size - height) // 2))
+    return surface
+
+
+class AssetManager:
+    """Game images scaled to size, loaded on a worker thread and cached on disk.
+
+    preload() queues (file, size) pairs and returns at once; image() hands
+    out a finished surface, waiting for the worker if it is not done yet.
+    Each scaled image is also written to ``cache_dir`` as raw RGBA under a
+    name that includes the source file's mtime, so the next launch skips
+    both the PNG decode and the smoothscale until the image is edited.
+    """
+
+    def __init__(self, image_dirs=IMAGE_DIRS, cache_dir=CACHE_DIR):
+        self.image_dirs = image_dirs
+        self.cache_dir = cache_dir
+        self.loaded = {}
+        self.converted = {}
+        self.total = 0
+        self.finished = threading.Event()
+        self.finished.set()
+        self.on_progress = None
+
+    # --- Background loading ---
+    def preload(self, jobs, on_progress=None):
+        jobs = [job for job in jobs if job not in self.loaded]
+        self.total += len(jobs)
+        self.on_progress = on_progress
+        if jobs:
+            self.finished.clear()
+            threading.Thread(target=self.run, args=(jobs,), name="assets", daemon=True).start()
+
+    def run(self, jobs):
+        for i, (name, size) in enumerate(jobs):
+            self.loaded[(name, size)] = self.load(name, size)
+            if i == len(jobs) - 1:
+                # Before the last callback, so whoever it wakes already sees done
+                self.finished.set()
+            if self.on_progress:
+                self.on_progress()
+
+    @property
+    def progress(self):
+        return len(self.loaded) / self.total if self.total else 1.0
+
+    @property
+    def done(self):
+        return self.finished.is_set()
+
+    def wait(self):
+        self.finished.wait()
+
+    # --- Loading one image ---
+    def cache_path(self, path, size):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.cache_dir, f"{stem}-{size}-{os.stat(path).st_mtime_ns}.rgba")
+
+    def load(self, name, size):
+        path = find(name, self.image_dirs)
+        if path is None:
+            print(f"Error loading image '{name}': not found in {', '.join(self.image_dirs)}")
+            return pygame.Surface((size, size), pygame.SRCALPHA)  # Transparent fallback
+        cached = self.cache_path(path, size)
+        try:
+            with open(cached, "rb") as f:
+                return _frombytes(f.read(), (size, size), "RGBA")
+        except (OSError, ValueError):
+            pass
+        try:
+            surface = scale_to_square(pygame.image.load(path), size)
+        except pygame.error as e:
+            print(f"Error loading image at '{path}': {e}")
+            return pygame.Surface((size, size), pygame.SRCALPHA)
+        self.store(cached, surface)
+        return surface
+
+    def store(self, cached, surface):
+        """Write the scaled image and drop versions cached for older mtimes."""
+        prefix = os.path.basename(cached).rsplit("-", 1)[0] + "-"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for old in glob.glob(os.path.join(glob.escape(self.cache_dir), glob.escape(prefix) + "*.rgba")):
+                os.remove(old)
+            tmp = cached + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(_tobytes(surface, "RGBA"))
+            os.replace(tmp, cached)
+        except OSError:
+            pass  # Caching is only an optimization
+
+    def image(self, name, size):
+        """The scaled image, converted for fast blitting to the display."""
+        key = (name, size)
+        surface = self.converted.get(key)
+        if surface is None:
+            if key not in self.loaded:
+                self.wait()
+            if key not in self.loaded:
+                self.loaded[key] = self.load(name, size)
+            surface = self.loaded[key]
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()
+            self.converted[key] = surface
+        return surface
+
+
+def font_path(name):
+    return find(name, FONT_DIRS) if name else None
+
+
+class FontRegistry:
+    """pygame.font.Font objects by (file, size), least recently used evicted.
+
+    Files are looked up next to the package (the bundled .ttf/.otf files) and
+    each is parsed once per size, so switching themes back and forth or
+    asking for HUD, title and menu sizes of one theme never reloads a font.
+    A missing file is reported once and served by pygame's default font.
+    """
+
+    def __init__(self, max_size=32):
+        self.max_size = max_size
+        self.fonts = OrderedDict()
+        self.missing = set()
+
+    def get(self, name, size):
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is not None:
+            self.fonts.move_to_end(key)
+            return font
+        path = font_path(name) if name not in self.missing else None
+        if name and path is None and name not in self.missing:
+            print(f"Warning: Font file '{name}' not found. Using default font.")
+            self.missing.add(name)
+        try:
+            font = pygame.font.Font(path, size)
+        except (OSError, pygame.error):
+            self.missing.add(name)
+            font = pygame.font.Font(None, size)
+        self.fonts[key] = font
+        if len(self.fonts) > self.max_size:
+            self.fonts.popitem(last=False)
+        return font
+
+
+def music_files(folder=MUSIC_DIR):
+    return sorted(glob.glob(os.path.join(folder, "*.mp3")))
@@ -0,0 +1,289 @@
+"""Run many snake games in lockstep with NumPy.
+
+This follows the same rules as engine.step() (wrap-around, the half-cell
+apple/bomb overlap test, the survival bomb timer) but keeps every game in
+flat arrays so a whole batch advances with a handful of vector operations.
+
+Positions in main.py are pixels and the board is not always a multiple of
+the cell size (700 / 32), so after wrapping the head can land between grid
+lines.  It can only ever reach points spaced gcd(cell, size) apart though,
+so occupancy is tracked on that lattice rather than on the food grid.
+
+Usage:  python batch_sim.py --games 2000 --steps 2000 --size 700x700 --bombs
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+import engine
+
+# Direction order matters: d ^ 1 is the reverse of d
+UP, DOWN, LEFT, RIGHT = 0, 1, 2, 3
+DIRECTIONS = np.array([engine.UP, engine.DOWN, engine.LEFT, engine.RIGHT], dtype=np.int64)
+
+ALIVE = 0
+DEATH_SELF = 1
+DEATH_BOMB = 2
+BOARD_FULL = 3
+OUT_OF_ROOM = 4
+DEATH_NAMES = {
+    ALIVE: "alive",
+    DEATH_SELF: engine.DEATH_SELF,
+    DEATH_BOMB: engine.DEATH_BOMB,
+    BOARD_FULL: "board full",
+    OUT_OF_ROOM: "out of room",
+}
+
+SPAWN_TRIES = 32
+NO_BOMB = -(1 << 30)  # bomb coordinates of a game without one; overlaps nothing
+
+
+class BatchSim:
+    """N independent games on the same board, stepped together."""
+
+    def __init__(self, board, n_games, bombs=False, seed=None, capacity=None):
+        self.board = board
+        self.n = n_games
+        self.bombs = bombs
+        self.rng = np.random.default_rng(seed)
+
+        w, h, cell = board.width, board.height, board.cell
+        self.x0, self.y0 = board.center()
+        self.gx = math.gcd(cell, w)
+        self.gy = math.gcd(cell, h)
+        self.cols = w // self.gx
+        self.rows = h // self.gy
+        self.step_x = cell // self.gx
+        self.step_y = cell // self.gy
+        self.cells = self.cols * self.rows
+        self.apple_offset = (cell - board.apple_size) // 2
+        self.bomb_offset = (board.bomb_size - cell) // 2
+        # Food and bombs sit on the cell grid, not on the head lattice
+        self.food_cols = (w - cell) // cell + 1
+        self.food_rows = (h - cell) // cell + 1
+
+        self.capacity = self.cells if capacity is None else min(capacity, self.cells)
+        # One spare slot so the new head never overwrites the tail it replaces
+        self.ring = self.capacity + 1
+        self.body = np.zeros((n_games, self.ring), dtype=np.int32)
+        self.start = np.zeros(n_games, dtype=np.int64)
+        self.length = np.ones(n_games, dtype=np.int64)
+        self.occupied = np.zeros(n_games * self.cells, dtype=np.uint8)
+        self.base = np.arange(n_games, dtype=np.int64) * self.cells
+
+        self.hx = np.zeros(n_games, dtype=np.int64)
+        self.hy = np.zeros(n_games, dtype=np.int64)
+        self.direction = np.full(n_games, UP, dtype=np.int64)
+        self.food = np.zeros((n_games, 2), dtype=np.int64)
+        self.bomb = np.zeros((n_games, 2), dtype=np.int64)
+        self.bomb_lifetime = np.zeros(n_games, dtype=np.int64)
+        self.has_bomb = np.zeros(n_games, dtype=bool)
+        self.score = np.zeros(n_games, dtype=np.int64)
+        self.ticks = np.zeros(n_games, dtype=np.int64)
+        self.death = np.zeros(n_games, dtype=np.int8)
+
+        everyone = np.arange(n_games)
+        self.body[:, 0] = 0
+        self.occupied[self.base] = 1
+        self.death[self._spawn(everyone, self.food, avoid_food=False)] = BOARD_FULL
+
+    # --- Geometry ---
+    def pixels(self, hx, hy):
+        return (self.x0 + hx * self.gx) % self.board.width, (self.y0 + hy * self.gy) % self.board.height
+
+    def _lattice(self, games, px, py):
+        """Flat occupancy index for pixel positions, or -1 if off the lattice."""
+        dx = (px - self.x0) % self.board.width
+        dy = (py - self.y0) % self.board.height
+        on = (dx % self.gx == 0) & (dy % self.gy == 0)
+        flat = self.base[games] + (dy // self.gy) * self.cols + dx // self.gx
+        return np.where(on, flat, -1)
+
+    def _on_snake(self, games, px, py):
+        flat = self._lattice(games, px, py)
+        hit = np.zeros(len(games), dtype=bool)
+        on = flat >= 0
+        hit[on] = self.occupied[flat[on]] != 0
+        return hit
+
+    def _overlap(self, px, py, target, offset, size):
+        """Vector form of Board.is_on_apple / Board.is_on_bomb."""
+        half = self.board.cell // 2
+        cx = target[:, 0] + offset + size // 2
+        cy = target[:, 1] + offset + size // 2
+        return (np.abs(px + half - cx) < half) & (np.abs(py + half - cy) < half)
+
+    # --- Spawning ---
+    def _spawn(self, games, out, avoid_food):
+        """Rejection-sample a free cell per game; exhaustive search as a fallback.
+
+        Returns the games that found no free cell, whose ``out`` is left alone.
+        """
+        cell = self.board.cell
+        todo = games
+        for _ in range(SPAWN_TRIES):
+            if not todo.size:
+                return todo
+            px = self.rng.integers(0, self.food_cols, todo.size) * cell
+            py = self.rng.integers(0, self.food_rows, todo.size) * cell
+            bad = self._on_snake(todo, px, py)
+            if avoid_food:
+                bad |= (px == self.food[todo, 0]) & (py == self.food[todo, 1])
+            good = ~bad
+            out[todo[good], 0] = px[good]
+            out[todo[good], 1] = py[good]
+            todo = todo[bad]
+        grid_x, grid_y = np.meshgrid(np.arange(self.food_cols) * cell, np.arange(self.food_rows) * cell)
+        grid_x, grid_y = grid_x.ravel(), grid_y.ravel()
+        missed = []
+        for game in todo:
+            games_col = np.full(grid_x.size, game)
+            free = ~self._on_snake(games_col, grid_x, grid_y)
+            if avoid_food:
+                free &= (grid_x != self.food[game, 0]) | (grid_y != self.food[game, 1])
+            choices = np.flatnonzero(free)
+            if choices.size:
+                pick = self.rng.choice(choices)
+                out[game] = (grid_x[pick], grid_y[pick])
+            else:
+                missed.append(game)
+        return np.array(missed, dtype=np.int64)
+
+    def _spawn_bombs(self, games):
+        """Like engine.spawn_bomb(): a game with no cell left for a bomb goes on without one."""
+        missed = self._spawn(games, self.bomb, avoid_food=True)
+        self.has_bomb[games] = True
+        self.has_bomb[missed] = False
+        self.bomb[missed] = NO_BOMB
+
+    # --- Stepping ---
+    def alive(self):
+        return np.flatnonzero(self.death == ALIVE)
+
+    def step(self, actions=None):
+        """Advance every live game by one tick.
+
+        ``actions`` is an int array of length N with UP/DOWN/LEFT/RIGHT or -1
+        to keep the current heading; reverse turns are ignored.
+        """
+        games = self.alive()
+        if not games.size:
+            return
+        self.ticks[games] += 1
+
+        if actions is not None:
+            act = actions[games]
+            turn = (act >= 0) & (act != (self.direction[games] ^ 1))
+            self.direction[games[turn]] = act[turn]
+
+        if self.bombs:
+            bx, by = self.bomb[games, 0], self.bomb[games, 1]
+            respawn = (~self.has_bomb[games]) | (self.bomb_lifetime[games] <= 0)
+            respawn |= (bx == self.food[games, 0]) & (by == self.food[games, 1])
+            respawn |= self._on_snake(games, bx, by)
+            fresh = games[respawn]
+            self._spawn_bombs(fresh)
+            self.bomb_lifetime[fresh] = self.rng.integers(*engine.BOMB_LIFETIME, endpoint=True, size=fresh.size)
+            self.bomb_lifetime[games[~respawn]] -= 1
+
+        d = DIRECTIONS[self.direction[games]]
+        hx = (self.hx[games] + d[:, 0] * self.step_x) % self.cols
+        hy = (self.hy[games] + d[:, 1] * self.step_y) % self.rows
+        px, py = self.pixels(hx, hy)
+
+        if self.bombs:
+            boom = self._overlap(px, py, self.bomb[games], self.bomb_offset, self.board.bomb_size)
+            self.death[games[boom]] = DEATH_BOMB
+            games, hx, hy, px, py = games[~boom], hx[~boom], hy[~boom], px[~boom], py[~boom]
+
+        flat = self.base[games] + hy * self.cols + hx
+        bitten = self.occupied[flat] != 0
+        self.death[games[bitten]] = DEATH_SELF
+        keep = ~bitten
+        games, hx, hy, px, py, flat = games[keep], hx[keep], hy[keep], px[keep], py[keep], flat[keep]
+
+        full = self.length[games] >= self.capacity
+        ate = self._overlap(px, py, self.food[games], self.apple_offset, self.board.apple_size)
+        cramped = full & ate
+        self.death[games[cramped]] = OUT_OF_ROOM
+        keep = ~cramped
+        games, hx, hy, flat, ate = games[keep], hx[keep], hy[keep], flat[keep], ate[keep]
+
+        self.hx[games] = hx
+        self.hy[games] = hy
+        start = (self.start[games] - 1) % self.ring
+        self.start[games] = start
+        self.body[games, start] = flat - self.base[games]
+        self.occupied[flat] = 1
+
+        grow = games[ate]
+        self.length[grow] += 1
+        self.score[grow] += engine.APPLE_POINTS
+
+        shrink = games[~ate]
+        tail_slot = (self.start[shrink] + self.length[shrink]) % self.ring
+        self.occupied[self.base[shrink] + self.body[shrink, tail_slot]] = 0
+
+        if grow.size:
+            self.death[self._spawn(grow, self.food, avoid_food=False)] = BOARD_FULL
+            if self.bombs:
+                grow = grow[self.death[grow] == ALIVE]
+                clash = grow[(self.bomb[grow, 0] == self.food[grow, 0]) & (self.bomb[grow, 1] == self.food[grow, 1])]
+                self._spawn_bombs(clash)
+
+    def run(self, steps, policy=None):
+        """Step up to ``steps`` ticks with ``policy(sim) -> actions``."""
+        for _ in range(steps):
+            if not (self.death == ALIVE).any():
+                break
+            self.step(None if policy is None else policy(self))
+        return self.results()
+
+    def results(self):
+        return {
+            "score": self.score.copy(),
+            "length": self.length.copy(),
+            "ticks": self.ticks.copy(),
+            "death": self.death.copy(),
+        }
+
+
+def random_policy(turn_chance=0.2):
+    """Turn in a random direction on roughly ``turn_chance`` of ticks."""
+    def policy(sim):
+        actions = sim.rng.integers(0, 4, sim.n)
+        actions[sim.rng.random(sim.n) >= turn_chance] = -1
+        return actions
+    return policy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-simulate snake games")
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--size", default="700x700", help="board size in pixels, as in settings_screen")
+    parser.add_argument("--cell", type=int, default=32)
+    parser.add_argument("--apple", type=int, default=22)
+    parser.add_argument("--bombs", action="store_true", help="survival mode rules")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    board = engine.Board(width, height, args.cell, args.apple, args.cell + 10)
+    sim = BatchSim(board, args.games, bombs=args.bombs, seed=args.seed)
+    start = time.perf_counter()
+    res = sim.run(args.steps, random_policy())
+    elapsed = time.perf_counter() - start
+
+    total = int(res["ticks"].sum())
+    print(f"{total} game-steps in {elapsed:.2f}s ({total / elapsed:,.0f} steps/s)")
+    print(f"mean score {res['score'].mean():.1f}  max score {res['score'].max()}  "
+          f"mean length {res['length'].mean():.1f}")
+    for code, name in DEATH_NAMES.items():
+        print(f"  {name:<12} {int((res['death'] == code).sum())}")
+
+
+if __name__ == "__main__":
+    main()
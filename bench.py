@@ -0,0 +1,725 @@
+"""Micro-benchmarks for the hot paths of the game.
+
+Usage:  python bench.py tick
+        python bench.py spawn
+        python bench.py render
+        python bench.py idle
+        python bench.py particles
+        python bench.py imports
+        python bench.py leaderboard
+        python bench.py body
+        python bench.py collisions
+        python bench.py snake
+        python bench.py giant
+        python bench.py playfield
+        python bench.py batch
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import engine
+
+
+def _walk(board, steps, start=(0, 0)):
+    """Cells visited by a walk that never bites itself on the torus.
+
+    Going ``cols - 1`` cells right and then one down covers the board row by
+    row; on a square board it comes back to a cell only after visiting every
+    other one, so a snake shorter than the cell count can follow it forever.
+    """
+    cols = board.width // board.cell
+    x, y = start
+    moves = []
+    for i in range(steps):
+        d = engine.DOWN if i % cols == cols - 1 else engine.RIGHT
+        x, y = board.wrap((x + d[0] * board.cell, y + d[1] * board.cell))
+        moves.append(((x, y), d))
+    return moves
+
+
+def _cycle(board, steps):
+    """Like _walk(), but along a cycle through every cell of any board with an even row count.
+
+    Right along row 0, then snaking left and right over columns 1.. in the
+    rows below, and back up column 0, so a snake one cell shorter than the
+    board can follow it forever without wrapping.
+    """
+    cols, rows = board.width // board.cell, board.height // board.cell
+    order = [(x, 0) for x in range(cols)]
+    for y in range(1, rows):
+        xs = range(1, cols) if y % 2 == 0 else range(cols - 1, 0, -1)
+        order += [(x, y) for x in xs]
+    order += [(0, y) for y in range(rows - 1, 0, -1)]
+    moves = []
+    for i in range(1, steps + 1):
+        (x0, y0), (x, y) = order[(i - 1) % len(order)], order[i % len(order)]
+        moves.append(((x * board.cell, y * board.cell), (x - x0, y - y0)))
+    return moves
+
+
+def bench_tick(args):
+    """Cost of engine.step() as the snake grows towards filling the board."""
+    # 31 x 31 cells: more than the 31 x 25 of the 1000x800 setting
+    board = engine.Board(992, 992, 32)
+    cells = (board.width // board.cell) * (board.height // board.cell)
+    print(f"{'length':>8} {'us/tick':>10}")
+    for length in (1, 10, 100, 250, 500, 775, cells - 1):
+        path = _walk(board, length + args.ticks)
+        body = [pos for pos, _ in reversed(path[:length])]
+        state = engine.new_game(board, snake=body, direction=path[length - 1][1], seed=0)
+        state.food = (-board.cell * 4, -board.cell * 4)  # out of reach: length stays fixed
+        actions = [d for _, d in path[length:]]
+        start = time.perf_counter()
+        for action in actions:
+            engine.step(state, action)
+        elapsed = time.perf_counter() - start
+        assert state.alive and len(state.snake) == length
+        print(f"{length:>8} {elapsed / len(actions) * 1e6:>10.2f}")
+
+
+def bench_spawn(args):
+    """engine.spawn_food() vs the old rejection sampling as the board fills."""
+    board = engine.Board(992, 992, 32)
+    cells = list(board.cells())
+    rng = random.Random(0)
+    print(f"{'filled':>8} {'index us':>10} {'rejection us':>13}")
+    for filled in (0.0, 0.5, 0.9, 0.99, 0.999):
+        taken = cells[:int(len(cells) * filled)]
+        state = engine.new_game(board, snake=taken or None, seed=0)
+        occupied = state.occupied
+        start = time.perf_counter()
+        for _ in range(args.ticks):
+            engine.spawn_food(state)
+        indexed = (time.perf_counter() - start) / args.ticks
+        start = time.perf_counter()
+        for _ in range(args.ticks):
+            while True:
+                pos = (rng.randrange(0, board.width - board.cell + 1, board.cell),
+                       rng.randrange(0, board.height - board.cell + 1, board.cell))
+                if pos not in occupied:
+                    break
+        rejection = (time.perf_counter() - start) / args.ticks
+        print(f"{filled:>8.1%} {indexed * 1e6:>10.2f} {rejection * 1e6:>13.2f}")
+
+
+def _legacy_frame(state, hud):
+    """What main.main() drew every tick before PlayfieldRenderer."""
+    import pygame
+    import main
+    main.bootstrap()
+    main.screen.fill(main.theme["bg"])
+    main.draw_grid()
+    main.draw_snake(state.snake)
+    main.draw_food(state.food)
+    for text, anchor, pos in hud:
+        label = main.font.render(text, True, main.theme["text"])
+        main.screen.blit(label, label.get_rect(**{anchor: pos}))
+    pygame.display.flip()
+
+
+def bench_render(args):
+    """Full-frame redraw vs the dirty-rect renderer on every settings size."""
+    import pygame
+    import main
+
+    main.bootstrap()
+    main.load_images()
+    print(f"{'size':>10} {'full ms':>9} {'dirty ms':>9}")
+    for width, height in main.SCREEN_SIZES:
+        main.WIDTH, main.HEIGHT = width, height
+        main.screen = pygame.display.set_mode((width, height))
+        board = main.current_board()
+        path = _walk(board, args.length + args.frames, start=board.center())
+        timings = []
+        for draw in (_legacy_frame, main.playfield.draw):
+            body = [pos for pos, _ in reversed(path[:args.length])]
+            state = engine.new_game(board, snake=body, direction=path[args.length - 1][1], seed=0)
+            main.playfield.invalidate()
+            start = time.perf_counter()
+            for i, (_, action) in enumerate(path[args.length:]):
+                engine.step(state, action)
+                draw(state, [
+                    (f"Score: {state.score}", "topleft", (10, 10)),
+                    (f"Length: {len(state.snake)}", "topleft", (10, 40)),
+                    (f"Time: 00:{i // 10 % 60:02}", "topright", (width - 20, 10)),
+                ])
+            timings.append((time.perf_counter() - start) / args.frames)
+        print(f"{width:>5}x{height:<4} {timings[0] * 1e3:>9.3f} {timings[1] * 1e3:>9.3f}")
+
+
+def bench_idle(args):
+    """CPU used while home_screen() sits untouched, vs the old spinning loop."""
+    import pygame
+    import main
+
+    main.bootstrap()
+
+    def cpu_share(run):
+        wall, cpu = time.perf_counter(), time.process_time()
+        run()
+        return (time.process_time() - cpu) / (time.perf_counter() - wall)
+
+    def spin():
+        # The pre-run_screen menu loop: repaint and poll as fast as possible
+        end = time.perf_counter() + args.seconds
+        while time.perf_counter() < end:
+            main.screen.fill(main.theme["bg"])
+            main.draw_button(pygame.Rect(60, 190, 240, 50), "Play New Game", active=True)
+            pygame.display.flip()
+            pygame.event.get()
+
+    def idle():
+        wake = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN, mod=0, unicode="\r")
+        pygame.time.set_timer(wake, int(args.seconds * 1000), 1)
+        main.home_screen()
+
+    print(f"spinning menu: {cpu_share(spin):6.1%} CPU")
+    print(f"home_screen(): {cpu_share(idle):6.1%} CPU")
+
+
+def bench_particles(args):
+    """Update + draw cost with ``--count`` live particles: dicts vs ParticlePool."""
+    import math
+    import pygame
+    from particles import ParticlePool
+
+    surface = pygame.Surface((700, 700))
+    color = (255, 215, 0, 255)
+
+    def legacy_emit(items, n):
+        # sprites.ParticleSystem before the pool
+        for _ in range(n):
+            angle = random.uniform(0, 2 * math.pi)
+            speed = random.uniform(1, 3)
+            items.append({"x": 350, "y": 350, "vx": math.cos(angle) * speed, "vy": math.sin(angle) * speed,
+                          "life": random.randint(20, 40), "color": color, "size": 3})
+
+    def legacy_frame(items):
+        for p in items[:]:
+            p["x"] += p["vx"]
+            p["y"] += p["vy"]
+            p["life"] -= 1
+            if p["life"] <= 0:
+                items.remove(p)
+        for p in items:
+            s = pygame.Surface((p["size"] * 2, p["size"] * 2), pygame.SRCALPHA)
+            pygame.draw.circle(s, (*p["color"][:3], min(255, p["life"] * 10)), (p["size"], p["size"]), p["size"])
+            surface.blit(s, (int(p["x"] - p["size"]), int(p["y"] - p["size"])))
+
+    def pool_frame(pool):
+        pool.update()
+        pool.draw(surface)
+
+    def run(frame, live, emit):
+        emit(args.count)
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            frame()
+            emit(args.count - live())  # keep the population topped up
+        return (time.perf_counter() - start) / args.frames
+
+    items = []
+    pool = ParticlePool(args.count, seed=0)
+    legacy = run(lambda: legacy_frame(items), lambda: len(items), lambda n: legacy_emit(items, n))
+    pooled = run(lambda: pool_frame(pool), lambda: len(pool),
+                 lambda n: pool.emit(350, 350, color, n, speed=(1, 3), life=(20, 40), size=3))
+    for name, seconds in (("dicts", legacy), ("ParticlePool", pooled)):
+        print(f"{name:>12}: {seconds * 1e3:7.2f} ms/frame ({1 / seconds:6.1f} fps) with {args.count} particles")
+
+
+# The rules engine is imported by tools and headless workers; keep it cheap
+ENGINE_IMPORT_BUDGET_MS = 5.0
+
+
+def _import_time(module, check):
+    """Cumulative import time (ms) of ``module`` in a fresh interpreter, and ``check``'s output."""
+    env = {**os.environ, "PYGAME_HIDE_SUPPORT_PROMPT": "1"}
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # time imports from .pyc, as installed
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}, sys; print({check})"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+    )
+    if out.returncode:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1])
+    for line in out.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000, out.stdout.strip()
+    raise RuntimeError(f"no importtime line for {module}")
+
+
+def bench_imports(args):
+    """Cold import cost of each module, and whether importing it starts pygame."""
+    checks = {
+        "engine": "'pygame' in sys.modules",
+        "timestep": "'pygame' in sys.modules",
+        "config": "sys.modules['pygame'].display.get_init()",
+        "main": "sys.modules['pygame'].display.get_init()",
+        "game": "sys.modules['pygame'].display.get_init()",
+    }
+    print(f"{'module':>10} {'best ms':>9}  pygame loaded / display open")
+    over = False
+    for module, check in checks.items():
+        _import_time(module, check)  # warm-up: writes bytecode, fills the OS file cache
+        runs = [_import_time(module, check) for _ in range(args.repeat)]
+        best = min(ms for ms, _ in runs)
+        print(f"{module:>10} {best:>9.2f}  {runs[0][1]}")
+        if module == "engine" and best > ENGINE_IMPORT_BUDGET_MS:
+            print(f"engine import exceeds the {ENGINE_IMPORT_BUDGET_MS} ms budget")
+            over = True
+    if over:
+        sys.exit(1)
+
+
+def bench_leaderboard(args):
+    """Leaderboard queries against a database of ``--count`` games."""
+    from leaderboard import DATE_SCAN_LIMIT, Leaderboard
+
+    rng = random.Random(0)
+    names = [f"player{i}" for i in range(1000)]
+
+    def run(queries):
+        print(f"{'query':>17} {'ms':>8}")
+        for name, query in queries.items():
+            query()
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                query()
+            print(f"{name:>17} {(time.perf_counter() - start) / args.repeat * 1e3:>8.3f}")
+
+    with tempfile.TemporaryDirectory() as folder:
+        board = Leaderboard(os.path.join(folder, "scores.db"))
+        start = time.perf_counter()
+        now = time.time()
+        board.add_many((rng.choice(names), rng.randrange(0, 5000, 10), rng.randrange(1, 600),
+                        now - rng.uniform(0, 365 * 86400), None) for _ in range(args.count))
+        print(f"inserted {args.count} games in {time.perf_counter() - start:.2f}s")
+        day = now - 86400
+        queries = {
+            "add one": lambda: board.add("bench", 10, 5),
+            "top 10": lambda: board.top(10),
+            "top 100": lambda: board.top(100),
+            "player best": lambda: board.best(rng.choice(names)),
+            "last 24h top 10": lambda: board.between(day, now + 1, 10),
+            "last 30d top 10": lambda: board.between(now - 30 * 86400, now + 1, 10),
+            "last 180d top 10": lambda: board.between(now - 180 * 86400, now + 1, 10),
+            "empty range": lambda: board.between(now + 86400, now + 2 * 86400, 10),
+        }
+        run(queries)
+        board.close()
+
+        # Skewed: the last day is busy but every recent game ranks below
+        # every old one, so walking the ranking finds none of them early
+        board = Leaderboard(os.path.join(folder, "skewed.db"))
+        board.add_many((rng.choice(names), rng.randrange(1000, 5000, 10), rng.randrange(1, 600),
+                        now - rng.uniform(2 * 86400, 365 * 86400), None) for _ in range(args.count))
+        board.add_many((rng.choice(names), 0, rng.randrange(1, 600), now - rng.uniform(0, 86400), None)
+                       for _ in range(DATE_SCAN_LIMIT + 1))
+        print(f"skewed: {args.count} old high scores, {DATE_SCAN_LIMIT + 1} zero scores in the last 24h")
+        run({
+            "last 24h top 10": lambda: board.between(day, now + 1, 10),
+            "last 30d top 10": lambda: board.between(now - 30 * 86400, now + 1, 10),
+        })
+        board.close()
+
+
+def bench_body(args):
+    """game.SnakeGame tick and body draw, per-segment sprites vs the body buffer."""
+    import itertools
+    import pygame
+    import game
+    from sprites import SnakeBody, SnakeHead
+
+    snake_game = game.SnakeGame()
+    board = snake_game.board
+    cells = (board.width // board.cell) * (board.height // board.cell)
+
+    def legacy_tick(group):
+        # What sync_sprites() did: copy the sprite list, then move every segment
+        segments = group.sprites()
+        for x, y in itertools.islice(snake_game.state.snake, len(segments), None):
+            segment = SnakeBody(x // board.cell, y // board.cell)
+            group.add(segment)
+            segments.append(segment)
+        for segment, (x, y) in zip(segments, snake_game.state.snake):
+            segment.update_position(x // board.cell, y // board.cell)
+
+    print(f"{'length':>8} {'sprites us/tick':>16} {'buffer us/tick':>15} {'sprites us/draw':>16} {'buffer us/draw':>15}")
+    for length in (4, 100, 300, 600, 900, cells - 1):
+        path = _cycle(board, length + args.ticks)
+        body = [pos for pos, _ in reversed(path[:length])]
+        actions = [d for _, d in path[length:]]
+        timings = []
+        for legacy in (True, False):
+            state = engine.new_game(board, snake=body, direction=path[length - 1][1], seed=0)
+            state.food = (-board.cell * 4, -board.cell * 4)  # out of reach: length stays fixed
+            snake_game.state = state
+            snake_game.body.reset((x // board.cell, y // board.cell) for x, y in state.snake)
+            group = pygame.sprite.Group(SnakeHead(0, 0), *(SnakeBody(x // board.cell, y // board.cell)
+                                                           for x, y in body[1:]))
+            start = time.perf_counter()
+            for action in actions:
+                engine.step(state, action)
+                if legacy:
+                    legacy_tick(group)
+                else:
+                    snake_game.sync_body()
+            tick = (time.perf_counter() - start) / len(actions)
+            start = time.perf_counter()
+            for _ in range(args.frames):
+                if legacy:
+                    group.draw(snake_game.screen)
+                else:
+                    snake_game.draw_body()
+            timings += [tick, (time.perf_counter() - start) / args.frames]
+            assert state.alive and len(state.snake) == length
+        sprite_tick, sprite_draw, buffer_tick, buffer_draw = (t * 1e6 for t in timings)
+        print(f"{length:>8} {sprite_tick:>16.1f} {buffer_tick:>15.1f} {sprite_draw:>16.1f} {buffer_draw:>15.1f}")
+
+
+def bench_collisions(args):
+    """Check the engine's cell-hash collisions against rect tests, and time both.
+
+    For every tick of ``--count`` random games on game.py's board, the
+    engine's verdicts (self-collision from the ``occupied`` set, eating from
+    the head's cell, spawn cells from FreeCells) are compared with what the
+    old sprite code got from rect tests against every segment.  Any
+    disagreement fails the run.
+    """
+    import pygame
+    from config import GRID_SIZE, HEIGHT, WIDTH
+
+    board = engine.Board(WIDTH, HEIGHT, GRID_SIZE)
+    size = (board.cell, board.cell)
+    all_cells = [pygame.Rect(pos, size) for pos in board.cells()]
+    rng = random.Random(0)
+    directions = (engine.UP, engine.DOWN, engine.LEFT, engine.RIGHT)
+    ticks = mismatches = 0
+    rect_time = hash_time = 0.0
+    longest = 0
+    for game in range(args.count):
+        state = engine.new_game(board, seed=game)
+        while state.alive:
+            # Mostly chase the apple, so snakes grow long enough to bite themselves
+            head = state.snake[0]
+            if rng.random() < 0.03:
+                action = rng.choice(directions)
+            elif state.food[0] != head[0]:
+                action = engine.RIGHT if state.food[0] > head[0] else engine.LEFT
+            else:
+                action = engine.DOWN if state.food[1] > head[1] else engine.UP
+            direction = action if not engine.is_reverse(action, state.direction) else state.direction
+            new_head = board.wrap((head[0] + direction[0] * board.cell, head[1] + direction[1] * board.cell))
+            start = time.perf_counter()
+            head_rect = pygame.Rect(new_head, size)
+            bites = head_rect.collidelist([pygame.Rect(pos, size) for pos in state.snake]) != -1
+            eats = not bites and head_rect.colliderect(pygame.Rect(state.food, size))
+            rect_time += time.perf_counter() - start
+            start = time.perf_counter()
+            hashed_bites = new_head in state.occupied
+            hash_time += time.perf_counter() - start
+            engine.step(state, action)
+            ticks += 1
+            mismatches += bites != hashed_bites
+            mismatches += bites != (state.death_cause == engine.DEATH_SELF)
+            mismatches += eats != state.ate
+            if state.ate or not state.alive:
+                # Spawn: every cell free by rect test must be in the free index, and only those
+                body_rects = [pygame.Rect(pos, size) for pos in state.snake]
+                free = {rect.topleft for rect in all_cells if rect.collidelist(body_rects) == -1}
+                mismatches += free != set(state.free.cells)
+        longest = max(longest, len(state.snake))
+    print(f"{args.count} games, {ticks} ticks, longest snake {longest}: {mismatches} mismatches")
+    print(f"self-collision per tick: rects {rect_time / ticks * 1e6:.2f} us, cell hash {hash_time / ticks * 1e6:.2f} us")
+    if mismatches:
+        sys.exit(1)
+
+
+def bench_snake(args):
+    """main.draw_snake() and the playfield per frame as the snake grows."""
+    import pygame
+    import main
+
+    main.bootstrap()
+    main.load_images()
+    # 31 x 24 cells, the largest board near the 1000x800 setting the cycle walk fits
+    main.WIDTH, main.HEIGHT = 992, 768
+    main.screen = pygame.display.set_mode((main.WIDTH, main.HEIGHT))
+    board = main.current_board()
+
+    def legacy_draw_snake(snake):
+        # One blit per segment, the head never rotated
+        for i, segment in enumerate(snake):
+            main.screen.blit(main.snake_head_img if i == 0 else main.snake_body_img, segment)
+
+    print(f"{'length':>8} {'per-blit us':>12} {'draw_snake us':>14} {'playfield us/frame':>19}")
+    for length in (10, 100, 300, 600, 740):
+        path = _cycle(board, length + args.frames)
+        body = [pos for pos, _ in reversed(path[:length])]
+        state = engine.new_game(board, snake=body, direction=path[length - 1][1], seed=0)
+        state.food = (-board.cell * 4, -board.cell * 4)
+        timings = []
+        for draw in (legacy_draw_snake, main.draw_snake):
+            start = time.perf_counter()
+            for _ in range(args.frames):
+                draw(state.snake)
+            timings.append((time.perf_counter() - start) / args.frames)
+        main.playfield.invalidate()
+        frames = 0
+        start = time.perf_counter()
+        for _, action in path[length:]:
+            engine.step(state, action)
+            for alpha in (0.25, 0.5, 0.75, 1.0):
+                main.playfield.draw(state, [], None, alpha)
+                frames += 1
+        timings.append((time.perf_counter() - start) / frames)
+        assert state.alive and len(state.snake) == length
+        legacy, batched, playfield = (t * 1e6 for t in timings)
+        print(f"{length:>8} {legacy:>12.1f} {batched:>14.1f} {playfield:>19.1f}")
+
+
+def bench_playfield(args):
+    """Check PlayfieldRenderer's dirty frames against full repaints on every settings size.
+
+    ``--frames`` ticks per size of a wandering snake, fed an apple on every
+    tick until it is ``--length`` long, drawn through the dirty-rect path;
+    every 5th tick the frame is compared with a fresh paint_all() of the
+    same state.  No settings size is a multiple of the cell on both axes,
+    so the snake wraps onto a finer lattice where its segments overlap,
+    and both paths must stack them alike.
+    """
+    import pygame
+    import main
+
+    main.bootstrap()
+    main.load_images()
+    rng = random.Random(0)
+    directions = (engine.UP, engine.DOWN, engine.LEFT, engine.RIGHT)
+    failed = False
+    print(f"{'size':>10} {'checked':>8} {'mismatches':>11}")
+    for width, height in main.SCREEN_SIZES:
+        main.WIDTH, main.HEIGHT = width, height
+        main.screen = pygame.display.set_mode((width, height))
+        board = main.current_board()
+        checked = mismatches = 0
+        state = None
+        for tick in range(args.frames):
+            if state is None or not state.alive:
+                state = engine.new_game(board, seed=rng.getrandbits(32))
+                main.playfield.invalidate()
+            # Keep going mostly straight, never into the body, so it wraps a lot
+            head = state.snake[0]
+            ahead = lambda d: board.wrap((head[0] + d[0] * board.cell, head[1] + d[1] * board.cell))
+            safe = [d for d in directions
+                    if not engine.is_reverse(d, state.direction) and ahead(d) not in state.occupied]
+            if not safe:
+                action = state.direction
+            elif state.direction in safe and rng.random() < 0.8:
+                action = state.direction
+            else:
+                action = rng.choice(safe)
+            if len(state.snake) < args.length:
+                state.food = ahead(action)
+            engine.step(state, action)
+            hud = [(f"Score: {state.score}", "topleft", (10, 10))]
+            for alpha in (0.5, 1.0):
+                main.playfield.draw(state, hud, None, alpha)
+            if tick % 5 == 0:
+                dirty = pygame.image.tobytes(main.screen, "RGB")
+                main.playfield.invalidate()
+                main.playfield.draw(state, hud, None, 1.0)
+                checked += 1
+                mismatches += dirty != pygame.image.tobytes(main.screen, "RGB")
+        failed = failed or mismatches > 0
+        print(f"{width:>5}x{height:<4} {checked:>8} {mismatches:>11}")
+    if failed:
+        sys.exit(1)
+
+
+class _RecordedCells(engine.FreeCells):
+    """FreeCells that also queues every cell it picks (None for none) into ``picks``."""
+
+    def __init__(self, board, occupied, picks):
+        super().__init__(board, occupied)
+        self.picks = picks
+
+    def choice(self, rng, exclude=None):
+        pos = super().choice(rng, exclude)
+        self.picks.append(pos)
+        return pos
+
+
+def bench_batch(args):
+    """Check batch_sim.BatchSim against engine.step() in lockstep on boards that fill up.
+
+    ``--count`` games per board, with bombs, played by the same greedy
+    policy in both simulators.  Every apple and bomb the engine spawns is
+    replayed into the batch (whose own search must come up empty exactly
+    when the engine's does), and the bomb timers are copied back,
+    so the two games stay identical: moves, eating, deaths, scores and
+    where the bomb is, or that there is none.  The boards are small enough
+    that the snake regularly leaves no cell for a bomb, where the game has
+    to go on without one.
+    """
+    from collections import deque
+
+    import numpy as np
+    import batch_sim
+
+    class ReplayedSim(batch_sim.BatchSim):
+        def __init__(self, board, picks):
+            self.picks = picks
+            self.disagree = set()
+            super().__init__(board, len(picks), bombs=True)
+
+        def _spawn(self, games, out, avoid_food):
+            # Search as usual, but place what the engine picked; both must
+            # agree on which games found no cell at all
+            found = super()._spawn(games, out.copy(), avoid_food)
+            missed = []
+            for game in games:
+                pos = self.picks[game].popleft()
+                if pos is None:
+                    missed.append(game)
+                else:
+                    out[game] = pos
+            self.disagree.update(set(found.tolist()) ^ set(missed))
+            return np.array(missed, dtype=np.int64)
+
+    directions = (engine.UP, engine.DOWN, engine.LEFT, engine.RIGHT)  # batch_sim.DIRECTIONS order
+    deaths = {None: batch_sim.ALIVE, engine.DEATH_SELF: batch_sim.DEATH_SELF,
+              engine.DEATH_BOMB: batch_sim.DEATH_BOMB, engine.BOARD_FULL: batch_sim.BOARD_FULL}
+    rng = random.Random(0)
+
+    def policy(state):
+        """Head for the apple, around the body and the bomb, with a random turn now and then."""
+        board = state.board
+        head = state.snake[0]
+        options = []
+        for i, d in enumerate(directions):
+            pos = board.wrap((head[0] + d[0] * board.cell, head[1] + d[1] * board.cell))
+            if engine.is_reverse(d, state.direction) or pos in state.occupied:
+                continue
+            if state.bomb is not None and board.is_on_bomb(pos, state.bomb):
+                continue
+            dx = min((pos[0] - state.food[0]) % board.width, (state.food[0] - pos[0]) % board.width)
+            dy = min((pos[1] - state.food[1]) % board.height, (state.food[1] - pos[1]) % board.height)
+            options.append((dx + dy, i))
+        if not options:
+            return -1
+        return rng.choice(options)[1] if rng.random() < 0.2 else min(options)[1]
+
+    failed = False
+    print(f"{'board':>8} {'games':>6} {'ticks':>7} {'no bomb':>8} {'full':>5} {'mismatches':>11}")
+    for width, height in ((64, 64), (128, 64), (128, 128)):
+        board = engine.Board(width, height, 32)
+        states = [engine.new_game(board, bombs=True, seed=rng.getrandbits(32)) for _ in range(args.count)]
+        picks = [deque([state.food]) for state in states]
+        for state, queue in zip(states, picks):
+            state.free = _RecordedCells(board, state.occupied, queue)
+        sim = ReplayedSim(board, picks)
+        ticks = bombless = mismatches = 0
+        live = list(range(args.count))
+        while live and ticks < args.ticks:
+            actions = np.full(args.count, -1, dtype=np.int64)
+            for game in live:
+                action = actions[game] = policy(states[game])
+                engine.step(states[game], None if action < 0 else directions[action])
+            sim.step(actions)
+            ticks += 1
+            still = []
+            for game in live:
+                state = states[game]
+                head = sim.pixels(sim.hx[game], sim.hy[game])
+                bomb = tuple(int(v) for v in sim.bomb[game]) if sim.has_bomb[game] else None
+                if (deaths[state.death_cause] != sim.death[game] or state.score != sim.score[game]
+                        or len(state.snake) != sim.length[game] or picks[game] or game in sim.disagree
+                        or (state.alive and (state.head != (head[0], head[1]) or state.bomb != bomb))):
+                    mismatches += 1
+                elif state.alive:
+                    state.bomb_lifetime = int(sim.bomb_lifetime[game])
+                    bombless += bomb is None
+                    still.append(game)
+            live = still
+        full = int((sim.death == batch_sim.BOARD_FULL).sum())
+        failed = failed or mismatches > 0
+        print(f"{width:>4}x{height:<3} {args.count:>6} {ticks:>7} {bombless:>8} {full:>5} {mismatches:>11}")
+    if failed:
+        sys.exit(1)
+
+
+def bench_giant(args):
+    """main.WorldRenderer per frame as the board grows, at a fixed window size."""
+    import pygame
+    import main
+
+    main.bootstrap()
+    main.load_images()
+    main.WIDTH, main.HEIGHT = main.SCREEN_SIZES[-1]
+    main.screen = pygame.display.set_mode((main.WIDTH, main.HEIGHT))
+    print(f"window {main.WIDTH}x{main.HEIGHT}, snake length {args.length}")
+    print(f"{'board cells':>13} {'new_game ms':>12} {'first frame ms':>15} {'us/frame':>9} {'worst us':>9}")
+    for cells in (64, 256, 1024, 2048, 4096):
+        board = engine.Board(cells * main.SNAKE_SIZE, cells * main.SNAKE_SIZE, main.SNAKE_SIZE,
+                             main.APPLE_SIZE, main.SNAKE_SIZE + 10)
+        path = _walk(board, args.length + args.frames, start=board.center())
+        body = [pos for pos, _ in reversed(path[:args.length])]
+        start = time.perf_counter()
+        state = engine.new_game(board, snake=body, direction=path[args.length - 1][1], seed=0)
+        setup = time.perf_counter() - start
+        state.food = (-board.cell * 4, -board.cell * 4)
+        main.world.invalidate()
+        start = time.perf_counter()
+        main.world.draw(state, [])
+        first = time.perf_counter() - start
+        timings = []
+        for _, action in path[args.length:]:
+            engine.step(state, action)
+            for alpha in (0.25, 0.5, 0.75, 1.0):
+                start = time.perf_counter()
+                main.world.draw(state, [(f"Score: {state.score}", "topleft", (10, 10))], alpha)
+                timings.append(time.perf_counter() - start)
+        assert state.alive and len(state.snake) == args.length
+        mean = sum(timings) / len(timings)
+        print(f"{cells:>6}x{cells:<6} {setup * 1e3:>12.2f} {first * 1e3:>15.2f} "
+              f"{mean * 1e6:>9.1f} {max(timings) * 1e6:>9.1f}")
+
+
+BENCHMARKS = {
+    "tick": bench_tick,
+    "spawn": bench_spawn,
+    "render": bench_render,
+    "idle": bench_idle,
+    "particles": bench_particles,
+    "imports": bench_imports,
+    "leaderboard": bench_leaderboard,
+    "body": bench_body,
+    "collisions": bench_collisions,
+    "snake": bench_snake,
+    "giant": bench_giant,
+    "playfield": bench_playfield,
+    "batch": bench_batch,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a micro-benchmark")
+    parser.add_argument("name", choices=sorted(BENCHMARKS))
+    parser.add_argument("--ticks", type=int, default=20000)
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--length", type=int, default=60, help="snake length for the render benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per module for imports")
+    parser.add_argument("--count", type=int, default=10000, help="live particles, leaderboard rows or games")
+    parser.add_argument("--seconds", type=float, default=3.0, help="how long the idle benchmark waits")
+    args = parser.parse_args()
+    BENCHMARKS[args.name](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -29,10 +29,6 @@ IMAGES_DIR = os.path.join(ASSETS_DIR, 'images')
 FONTS_DIR = os.path.join(ASSETS_DIR, 'fonts')
 SOUNDS_DIR = os.path.join(ASSETS_DIR, 'sounds')
 
-# Ensure directories exist
-os.makedirs(IMAGES_DIR, exist_ok=True)
-os.makedirs(FONTS_DIR, exist_ok=True)
-os.makedirs(SOUNDS_DIR, exist_ok=True)
 
 class Direction(Enum):
     UP = (0, -1)
@@ -76,15 +72,25 @@ def load_theme(theme_name='default'):
     }
     return themes.get(theme_name.lower(), themes['default'])
 
-# Initialize pygame
-pygame.mixer.pre_init(44100, -16, 2, 2048)
-pygame.init()
-pygame.display.set_caption('Snake Game')
-
-# Display settings
-screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.DOUBLEBUF | pygame.HWSURFACE)
-clock = pygame.time.Clock()
+# Display settings, filled in by init_pygame()
+screen = None
+clock = None
 
 # Set allowed events for better performance
 event_types = [pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.VIDEORESIZE]
-pygame.event.set_allowed(event_types)
+
+def init_pygame():
+    """Start pygame and open the window.  Importing this module does neither."""
+    global screen, clock
+    if screen is not None:
+        return screen
+    # Ensure directories exist
+    for folder in (IMAGES_DIR, FONTS_DIR, SOUNDS_DIR):
+        os.makedirs(folder, exist_ok=True)
+    pygame.mixer.pre_init(44100, -16, 2, 2048)
+    pygame.init()
+    pygame.display.set_caption('Snake Game')
+    screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.DOUBLEBUF | pygame.HWSURFACE)
+    clock = pygame.time.Clock()
+    pygame.event.set_allowed(event_types)
+    return screen
@@ -0,0 +1,350 @@
+"""Headless snake rules shared by main.py and game.py.
+
+Nothing in here touches pygame, so the engine can be imported and stepped
+without a display for balancing runs and regression checks.  Positions are
+pixel coordinates (the top-left corner of a cell) exactly like the original
+``main.main()`` loop; directions are unit vectors such as ``(0, -1)``.
+"""
+from collections import deque
+
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+
+APPLE_POINTS = 10
+BOMB_LIFETIME = (80, 160)
+
+DEATH_SELF = "self"
+DEATH_BOMB = "bomb"
+BOARD_FULL = "full"
+
+
+class Board:
+    """Playfield geometry: screen size in pixels and the size of one cell."""
+
+    def __init__(self, width, height, cell, apple_size=None, bomb_size=None):
+        self.width = width
+        self.height = height
+        self.cell = cell
+        self.apple_size = cell if apple_size is None else apple_size
+        self.bomb_size = cell + 10 if bomb_size is None else bomb_size
+
+    def wrap(self, pos):
+        return (pos[0] % self.width, pos[1] % self.height)
+
+    def center(self):
+        return (self.width // 2, self.height // 2)
+
+    def is_on_apple(self, head, food):
+        """Head overlaps the apple by more than half a cell on both axes."""
+        half = self.cell // 2
+        offset = (self.cell - self.apple_size) // 2
+        apple_x = food[0] + offset + self.apple_size // 2
+        apple_y = food[1] + offset + self.apple_size // 2
+        return abs(head[0] + half - apple_x) < half and abs(head[1] + half - apple_y) < half
+
+    def is_on_bomb(self, head, bomb):
+        """Same overlap test as the apple, using the (larger) bomb sprite."""
+        half = self.cell // 2
+        offset = (self.bomb_size - self.cell) // 2
+        bomb_x = bomb[0] + offset + self.bomb_size // 2
+        bomb_y = bomb[1] + offset + self.bomb_size // 2
+        return abs(head[0] + half - bomb_x) < half and abs(head[1] + half - bomb_y) < half
+
+    def is_cell(self, pos):
+        """Whether ``pos`` is on the grid food and bombs are placed on."""
+        x, y = pos
+        return (x % self.cell == 0 and y % self.cell == 0
+                and 0 <= x <= self.width - self.cell and 0 <= y <= self.height - self.cell)
+
+    def cells(self):
+        for y in range(0, self.height - self.cell + 1, self.cell):
+            for x in range(0, self.width - self.cell + 1, self.cell):
+                yield (x, y)
+
+
+class FreeCells:
+    """Grid cells not covered by the snake, with O(1) add, remove and pick.
+
+    A swap-remove list plus a position -> slot map.  Only positions on the
+    spawn grid are tracked; on boards that are not a multiple of the cell
+    size the head can wrap onto off-grid positions, which never block a
+    spawn and are simply ignored here.
+    """
+
+    def __init__(self, board, occupied=()):
+        self.board = board
+        self.cells = [pos for pos in board.cells() if pos not in occupied]
+        self.slot = {pos: i for i, pos in enumerate(self.cells)}
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, pos):
+        return pos in self.slot
+
+    def add(self, pos):
+        if pos not in self.slot and self.board.is_cell(pos):
+            self.slot[pos] = len(self.cells)
+            self.cells.append(pos)
+
+    def discard(self, pos):
+        i = self.slot.pop(pos, None)
+        if i is None:
+            return
+        last = self.cells.pop()
+        if i < len(self.cells):
+            self.cells[i] = last
+            self.slot[last] = i
+
+    def choice(self, rng, exclude=None):
+        """A uniformly random free cell other than ``exclude``, or None."""
+        n = len(self.cells)
+        if exclude in self.slot:
+            if n < 2:
+                return None
+            # Pick among the first n - 1 slots and let the excluded cell's
+            # slot stand in for the last one
+            pos = self.cells[rng.randrange(n - 1)]
+            return self.cells[-1] if pos == exclude else pos
+        if not n:
+            return None
+        return self.cells[rng.randrange(n)]
+
+
+class SparseFreeCells:
+    """FreeCells for boards too big to list every cell of.
+
+    Only the taken grid cells are stored, and a pick draws random cells
+    until it finds a free one.  That takes ``cells / free`` draws on
+    average, so it is only used on boards the snake cannot realistically
+    fill (see DENSE_CELLS_LIMIT); memory and start-up follow the snake's
+    length instead of the board's area.
+    """
+
+    def __init__(self, board, occupied=()):
+        self.board = board
+        self.cols = board.width // board.cell
+        self.rows = board.height // board.cell
+        self.taken = {pos for pos in occupied if board.is_cell(pos)}
+
+    def __len__(self):
+        return self.cols * self.rows - len(self.taken)
+
+    def __contains__(self, pos):
+        return pos not in self.taken and self.board.is_cell(pos)
+
+    def add(self, pos):
+        self.taken.discard(pos)
+
+    def discard(self, pos):
+        if self.board.is_cell(pos):
+            self.taken.add(pos)
+
+    def choice(self, rng, exclude=None):
+        """A uniformly random free cell other than ``exclude``, or None."""
+        if len(self) - (exclude is not None and exclude in self) < 1:
+            return None
+        cell = self.board.cell
+        while True:
+            pos = (rng.randrange(self.cols) * cell, rng.randrange(self.rows) * cell)
+            if pos not in self.taken and pos != exclude:
+                return pos
+
+
+# Boards with more grid cells than this index only the taken ones
+DENSE_CELLS_LIMIT = 1 << 16
+
+
+def free_cells(board, occupied=()):
+    """The free cell index that suits ``board``'s size."""
+    cells = (board.width // board.cell) * (board.height // board.cell)
+    index = FreeCells if cells <= DENSE_CELLS_LIMIT else SparseFreeCells
+    return index(board, occupied)
+
+
+class GameState:
+    """Everything needed to advance one game by a tick.
+
+    ``ate`` and ``death_cause`` describe what happened on the last step so the
+    front-ends can play sounds and effects without re-checking the rules.
+    The body is a deque (head first) mirrored by the ``occupied`` set and
+    the ``free`` cell index, so moving, growing, the self-collision test and
+    spawning are all O(1).
+    """
+
+    def __init__(self, board, snake, direction, rng, bombs=False):
+        self.board = board
+        self.snake = deque(snake)
+        self.occupied = set(self.snake)
+        self.free = free_cells(board, self.occupied)
+        self.direction = direction
+        self.rng = rng
+        self.seed = None  # set when the RNG was built from a seed, so the game can be replayed
+        self.bombs = bombs
+        self.food = None
+        self.bomb = None
+        self.bomb_lifetime = 0
+        self.score = 0
+        self.tick = 0
+        self.alive = True
+        self.ate = False
+        self.death_cause = None
+        self.won = False
+        # Where the head and tail were before the last step, for interpolation
+        self.prev_head = None
+        self.prev_tail = None
+
+    @property
+    def head(self):
+        return self.snake[0]
+
+
+def spawn_food(state):
+    """A free cell for the apple, or None when the snake covers the board."""
+    return state.free.choice(state.rng)
+
+
+def spawn_bomb(state):
+    """A free cell other than the apple's, or None if there is none left."""
+    return state.free.choice(state.rng, exclude=state.food)
+
+
+def new_game(board, snake=None, direction=UP, seed=None, bombs=False, rng=None):
+    """Start a game; by default a single segment in the middle heading up.
+
+    Unless an ``rng`` is passed in, the game gets its own random.Random(seed)
+    and, for a given seed, replays identically.
+    """
+    own_rng = rng is None
+    if own_rng:
+        import random  # only here, so importing the engine stays cheap
+        rng = random.Random(seed)
+    if snake is None:
+        snake = [board.center()]
+    state = GameState(board, snake, direction, rng, bombs=bombs)
+    if own_rng:
+        state.seed = seed
+    state.food = spawn_food(state)
+    return state
+
+
+def is_reverse(a, b):
+    return a[0] == -b[0] and a[1] == -b[1]
+
+
+class TurnQueue:
+    """Arrow presses waiting for the ticks that will apply them, one per tick.
+
+    A fixed ring of slots, so pushing and popping never allocate.  A press
+    is dropped if it repeats or reverses the turn queued before it, and a
+    popped turn is checked again against the direction actually applied, so
+    a quick double turn can never fold the head back into the neck.  An
+    empty queue applies the next press on the very next tick.
+    """
+
+    def __init__(self, size=3):
+        self.slots = [None] * size
+        self.start = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.start = 0
+        self.count = 0
+
+    def push(self, direction):
+        size = len(self.slots)
+        if self.count:
+            last = self.slots[(self.start + self.count - 1) % size]
+            if direction == last or is_reverse(direction, last):
+                return False
+        if self.count == size:
+            return False
+        self.slots[(self.start + self.count) % size] = direction
+        self.count += 1
+        return True
+
+    def pop(self, current):
+        """The next turn that is valid from ``current``, or None to go straight."""
+        while self.count:
+            direction = self.slots[self.start]
+            self.start = (self.start + 1) % len(self.slots)
+            self.count -= 1
+            if direction != current and not is_reverse(direction, current):
+                return direction
+        return None
+
+
+def step(state, action=None):
+    """Advance ``state`` by one tick and return it.
+
+    ``action`` is the direction requested for this tick (or None to keep
+    going); a 180-degree turn is ignored.  The state is updated in place so
+    long games do not copy the body every tick.
+    """
+    if not state.alive:
+        return state
+    board = state.board
+    rng = state.rng
+    state.ate = False
+    state.tick += 1
+
+    if action is not None and not is_reverse(action, state.direction):
+        state.direction = action
+
+    if state.bombs:
+        # Bomb logic: spawn new bomb if needed, decrement lifetime, remove if expired
+        bomb = state.bomb
+        if bomb is None or state.bomb_lifetime <= 0 or bomb == state.food or bomb in state.occupied:
+            state.bomb = spawn_bomb(state)
+            state.bomb_lifetime = rng.randint(*BOMB_LIFETIME)
+        else:
+            state.bomb_lifetime -= 1
+
+    head = state.snake[0]
+    new_head = board.wrap((head[0] + state.direction[0] * board.cell,
+                           head[1] + state.direction[1] * board.cell))
+
+    if state.bomb is not None and board.is_on_bomb(new_head, state.bomb):
+        state.alive = False
+        state.death_cause = DEATH_BOMB
+        return state
+    if new_head in state.occupied:
+        state.alive = False
+        state.death_cause = DEATH_SELF
+        return state
+
+    state.prev_head = head
+    state.prev_tail = state.snake[-1]
+    state.snake.appendleft(new_head)
+    state.occupied.add(new_head)
+    state.free.discard(new_head)
+    if board.is_on_apple(new_head, state.food):
+        state.ate = True
+        state.score += APPLE_POINTS
+        state.food = spawn_food(state)
+        if state.food is None:
+            # Nowhere left to put an apple: the snake has filled the board
+            state.alive = False
+            state.won = True
+            state.death_cause = BOARD_FULL
+            return state
+        # Make sure bomb doesn't overlap with new food
+        if state.bombs and state.bomb == state.food:
+            state.bomb = spawn_bomb(state)
+    else:
+        tail = state.snake.pop()
+        state.occupied.discard(tail)
+        state.free.add(tail)
+    return state
+
+
+def simulate(state, policy, max_ticks=None):
+    """Step ``state`` with ``policy(state) -> action`` until it dies."""
+    while state.alive and (max_ticks is None or state.tick < max_ticks):
+        step(state, policy(state))
+    return state
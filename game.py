@@ -7,28 +7,37 @@ import json
 import sys
 from enum import Enum
 import threading
+import itertools
+import numpy as np
 from config import *
 from sprites import *
+import engine
+from sound import AudioService
+from profile_store import ProfileStore
+from text_cache import TextCache
+from timestep import FixedTimestep
 
 class SnakeGame:
     def __init__(self):
-        pygame.init()
+        init_pygame()
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.DOUBLEBUF | pygame.HWSURFACE)
         pygame.display.set_caption('Snake Game - Enhanced')
         self.clock = pygame.time.Clock()
         self.running = True
         self.state = GameState.MENU
         self.score = 0
-        self.high_score = self.load_high_score()
+        self.profile = ProfileStore().load()
+        self.high_score = self.profile.high_score('enhanced')
         self.theme = load_theme('default')
         self.font = pygame.font.Font(None, 36)
+        self.text_cache = TextCache()
         self.particle_system = ParticleSystem()
         self.snake = []
         self.food = []
         self.direction = Direction.RIGHT
-        self.next_direction = Direction.RIGHT
+        self.turns = engine.TurnQueue()
         self.game_speed = FPS
-        self.last_update = 0
+        self.timestep = FixedTimestep(self.game_speed)
         self.paused = False
         self.game_over = False
         self.init_assets()
@@ -36,12 +45,8 @@ class SnakeGame:
         self.spawn_food()
 
     def init_assets(self):
-        # Load sounds
-        self.sounds = {
-            'eat': self.load_sound('eat.wav'),
-            'game_over': self.load_sound('game_over.wav'),
-            'powerup': self.load_sound('powerup.wav')
-        }
+        # Sounds: loaded from SOUNDS_DIR, or synthesized when a file is missing
+        self.audio = AudioService(SOUNDS_DIR)
         
         # Load images with error handling
         try:
@@ -60,42 +65,27 @@ class SnakeGame:
             print(f"Error loading image {filename}: {e}")
         return None
 
-    def load_sound(self, filename):
-        try:
-            path = os.path.join(SOUNDS_DIR, filename)
-            if os.path.exists(path):
-                return pygame.mixer.Sound(path)
-        except Exception as e:
-            print(f"Error loading sound {filename}: {e}")
-        return None
-
     def init_snake(self):
-        self.snake = []
         start_x, start_y = GRID_WIDTH // 2, GRID_HEIGHT // 2
-        self.snake_head = SnakeHead(start_x, start_y)
-        self.snake_sprites = pygame.sprite.Group()
-        self.snake_sprites.add(self.snake_head)
-        
-        # Add initial body segments
-        for i in range(1, 4):
-            self.add_segment(start_x - i, start_y)
-
-    def add_segment(self, x, y):
-        segment = SnakeBody(x, y)
-        self.snake_sprites.add(segment)
-        return segment
+        self.board = engine.Board(WIDTH, HEIGHT, GRID_SIZE)
+        body = [((start_x - i) * GRID_SIZE, start_y * GRID_SIZE) for i in range(4)]
+        self.game = engine.new_game(self.board, snake=body, direction=Direction.RIGHT.value,
+                                     seed=random.getrandbits(64))
+        # Only the head is a sprite; the body is a ring of grid cells drawn
+        # from one shared frame, so growing never creates objects
+        self.body = SnakeBodyBuffer(GRID_WIDTH * GRID_HEIGHT)
+        self.body.reset((x // GRID_SIZE, y // GRID_SIZE) for x, y in self.game.snake)
+        self.snake_head = SnakeHead(start_x, start_y, self.theme)
+        self.snake_sprites = pygame.sprite.Group(self.snake_head)
 
     def spawn_food(self):
-        while True:
-            x = random.randint(0, GRID_WIDTH - 1)
-            y = random.randint(0, GRID_HEIGHT - 1)
-            pos = (x * GRID_SIZE, y * GRID_SIZE)
-            
-            # Check if position is occupied by snake
-            if not any(segment.rect.topleft == pos for segment in self.snake_sprites):
-                self.food = Food(x, y)
-                self.food_sprites = pygame.sprite.Group(self.food)
-                return
+        # The engine picks the cell; we only wrap it in a sprite
+        if self.game.food is None:
+            self.food_sprites = pygame.sprite.Group()
+            return
+        x, y = self.game.food
+        self.food = Food(x // GRID_SIZE, y // GRID_SIZE, self.theme)
+        self.food_sprites = pygame.sprite.Group(self.food)
 
     def handle_events(self):
         for event in pygame.event.get():
@@ -108,13 +98,13 @@ class SnakeGame:
                 
                 if not self.paused and not self.game_over:
                     if event.key == pygame.K_UP:
-                        self.next_direction = Direction.UP
+                        self.turns.push(Direction.UP.value)
                     elif event.key == pygame.K_DOWN:
-                        self.next_direction = Direction.DOWN
+                        self.turns.push(Direction.DOWN.value)
                     elif event.key == pygame.K_LEFT:
-                        self.next_direction = Direction.LEFT
+                        self.turns.push(Direction.LEFT.value)
                     elif event.key == pygame.K_RIGHT:
-                        self.next_direction = Direction.RIGHT
+                        self.turns.push(Direction.RIGHT.value)
                 
                 elif event.key == pygame.K_r:  # Reset game
                     self.reset_game()
@@ -123,41 +113,36 @@ class SnakeGame:
         if self.paused or self.game_over:
             return
 
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_update < 1000 // self.game_speed:
-            return
-        
-        self.last_update = current_time
-
-        # Update snake direction
-        self.snake_head.update_direction(self.next_direction)
-        
-        # Store current positions before moving
-        old_positions = [(segment.rect.x // GRID_SIZE, segment.rect.y // GRID_SIZE) 
-                        for segment in self.snake_sprites]
-        
-        # Move head
-        self.snake_head.update()
+        engine.step(self.game, self.turns.pop(self.game.direction))
+        AnimatedSprite.advance()
+        self.direction = Direction(self.game.direction)
+        self.sync_body()
         
-        # Update body segments to follow the segment in front of them
-        for i in range(1, len(self.snake_sprites)):
-            prev_x, prev_y = old_positions[i-1]
-            self.snake_sprites.sprites()[i].update_position(prev_x, prev_y)
-        
-        # Check for collisions
+        # React to what happened this tick
         self.check_collisions()
 
+    def sync_body(self):
+        """Repeat the engine's last move on the body buffer, O(1) at any length"""
+        state = self.game
+        if not (state.alive or state.won):
+            return  # a fatal move never reaches the new cell
+        x, y = state.snake[0]
+        self.body.push_head(x // GRID_SIZE, y // GRID_SIZE)
+        if not state.ate:
+            self.body.pop_tail()
+        self.snake_head.direction = self.direction
+        self.snake_head.update_position(x // GRID_SIZE, y // GRID_SIZE)
+
     def check_collisions(self):
+        # engine.step() already tested the head against its cell hash of the
+        # body (state.occupied) and the apple's cell; `python bench.py
+        # collisions` checks those answers against rect tests
         # Check food collision
         head_rect = self.snake_head.rect
-        if pygame.sprite.spritecollide(self.snake_head, self.food_sprites, True):
-            self.score += 10
-            self.sounds['eat'].play()
+        if self.game.ate:
+            self.score = self.game.score
+            self.audio.play('eat')
             self.spawn_food()
-            # Add new segment at the end
-            last_segment = self.snake_sprites.sprites()[-1]
-            self.add_segment(*divmod(last_segment.rect.x, GRID_SIZE), 
-                           *divmod(last_segment.rect.y, GRID_SIZE))
             
             # Create particle effect
             self.particle_system.create_particles(
@@ -165,12 +150,11 @@ class SnakeGame:
                 (255, 255, 0), count=20, size=4, speed=3
             )
         
-        # Check self collision (skip head)
-        if pygame.sprite.spritecollide(self.snake_head, 
-                                     [s for s in self.snake_sprites if s != self.snake_head], 
-                                     False):
+        # Check self collision
+        if not self.game.alive:
             self.game_over = True
-            self.sounds['game_over'].play()
+            self.audio.play('gameover')
+            self.save_high_score()
 
     def draw(self):
         # Draw background
@@ -184,6 +168,7 @@ class SnakeGame:
         
         # Draw food and snake
         self.food_sprites.draw(self.screen)
+        self.draw_body()
         self.snake_sprites.draw(self.screen)
         
         # Draw particles
@@ -200,6 +185,14 @@ class SnakeGame:
         
         pygame.display.flip()
 
+    def draw_body(self):
+        """Every segment behind the head in one blits call, all showing the same atlas frame"""
+        frame = atlas.frame('body', AnimatedSprite.ticks // SnakeBody.FRAME_DELAY, theme=self.theme)
+        xs, ys = self.body.cells()
+        xs = np.multiply(xs[1:], GRID_SIZE, dtype=np.int32).tolist()
+        ys = np.multiply(ys[1:], GRID_SIZE, dtype=np.int32).tolist()
+        self.screen.blits(zip(itertools.repeat(frame), zip(xs, ys)), doreturn=False)
+
     def draw_grid(self):
         for x in range(0, WIDTH, GRID_SIZE):
             pygame.draw.line(self.screen, (40, 40, 40, 50), (x, 0), (x, HEIGHT))
@@ -208,27 +201,30 @@ class SnakeGame:
 
     def draw_hud(self):
         # Score
-        score_surf = self.font.render(f'Score: {self.score}', True, self.theme['text'])
+        score_surf = self.text_cache.render_number(self.font, f'Score: {self.score}', self.theme['text'])
         self.screen.blit(score_surf, (10, 10))
         
         # High score
-        high_score_surf = self.font.render(f'High Score: {self.high_score}', True, self.theme['text'])
+        high_score_surf = self.text_cache.render_number(self.font, f'High Score: {self.high_score}', self.theme['text'])
         self.screen.blit(high_score_surf, (10, 50))
         
         # FPS counter (for debugging)
-        fps_surf = self.font.render(f'FPS: {int(self.clock.get_fps())}', True, self.theme['text'])
+        fps_surf = self.text_cache.render_number(self.font, f'FPS: {int(self.clock.get_fps())}', self.theme['text'])
         self.screen.blit(fps_surf, (WIDTH - 120, 10))
+        jitter, _ = self.timestep.jitter()
+        jitter_surf = self.text_cache.render_number(self.font, f'Jitter: {jitter:.1f}ms', self.theme['text'])
+        self.screen.blit(jitter_surf, (WIDTH - 180, 50))
 
     def draw_pause_screen(self):
         s = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
         s.fill((0, 0, 0, 128))
         self.screen.blit(s, (0, 0))
         
-        text = self.font.render('PAUSED', True, WHITE)
+        text = self.text_cache.render(self.font, 'PAUSED', WHITE)
         text_rect = text.get_rect(center=(WIDTH//2, HEIGHT//2))
         self.screen.blit(text, text_rect)
         
-        subtext = self.font.render('Press ESC to resume', True, WHITE)
+        subtext = self.text_cache.render(self.font, 'Press ESC to resume', WHITE)
         subtext_rect = subtext.get_rect(center=(WIDTH//2, HEIGHT//2 + 50))
         self.screen.blit(subtext, subtext_rect)
 
@@ -237,15 +233,15 @@ class SnakeGame:
         s.fill((0, 0, 0, 200))
         self.screen.blit(s, (0, 0))
         
-        text = self.font.render('GAME OVER', True, RED)
+        text = self.text_cache.render(self.font, 'GAME OVER', RED)
         text_rect = text.get_rect(center=(WIDTH//2, HEIGHT//2 - 50))
         self.screen.blit(text, text_rect)
         
-        score_text = self.font.render(f'Final Score: {self.score}', True, WHITE)
+        score_text = self.text_cache.render(self.font, f'Final Score: {self.score}', WHITE)
         score_rect = score_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 20))
         self.screen.blit(score_text, score_rect)
         
-        subtext = self.font.render('Press R to restart', True, WHITE)
+        subtext = self.text_cache.render(self.font, 'Press R to restart', WHITE)
         subtext_rect = subtext.get_rect(center=(WIDTH//2, HEIGHT//2 + 70))
         self.screen.blit(subtext, subtext_rect)
 
@@ -254,33 +250,33 @@ class SnakeGame:
         self.game_over = False
         self.paused = False
         self.direction = Direction.RIGHT
-        self.next_direction = Direction.RIGHT
+        self.turns = engine.TurnQueue()
         self.game_speed = FPS
+        self.timestep.set_rate(self.game_speed)
+        self.timestep.reset(pygame.time.get_ticks())
         self.snake_sprites.empty()
         self.init_snake()
         self.spawn_food()
         self.particle_system = ParticleSystem()
 
-    def load_high_score(self):
-        try:
-            with open('highscore.dat', 'rb') as f:
-                return int(f.read())
-        except (FileNotFoundError, ValueError):
-            return 0
-
     def save_high_score(self):
-        if self.score > self.high_score:
-            with open('highscore.dat', 'wb') as f:
-                f.write(str(self.score).encode())
+        """Count the finished game in the profile, which saves it in the background"""
+        if self.profile.record_game('enhanced', self.score, self.score // engine.APPLE_POINTS,
+                                    len(self.game.snake), self.game.tick / self.game_speed):
+            self.high_score = self.score
 
     def run(self):
         while self.running:
             self.handle_events()
-            self.update()
+            # One update() per game tick, however many frames that spans
+            for _ in range(self.timestep.advance(pygame.time.get_ticks())):
+                self.update()
             self.draw()
             self.clock.tick(60)  # Cap at 60 FPS
         
-        self.save_high_score()
+        if not self.game_over:
+            self.save_high_score()  # quitting mid-game still counts
+        self.profile.flush()
         pygame.quit()
         sys.exit()
 
@@ -1,60 +1,183 @@
-import os
-import json
-import requests
-
-class LanguageManager:
-    def __init__(self, cache_file="translations.json", source_lang="en"):
-        self.source_lang = source_lang
-        self.target_lang = source_lang
-        self.cache_file = cache_file
-        self.cache = {}
-        self.load_cache()
-
-    def set_language(self, lang_code):
-        self.target_lang = lang_code
-
-    def _cache_key(self, text):
-        # Key format: "en:fr:Text Here"
-        return f"{self.source_lang}:{self.target_lang}:{text}"
-
-    def smart_translate(self, text):
-        if self.target_lang == self.source_lang:
-            return text
-        key = self._cache_key(text)
-        if key in self.cache:
-            return self.cache[key]
-        try:
-            resp = requests.post(
-                "https://libretranslate.com/translate",
-                data={
-                    "q": text,
-                    "source": self.source_lang,
-                    "target": self.target_lang,
-                    "format": "text"
-                },
-                timeout=5
-            )
-            if resp.status_code == 200:
-                translated = resp.json().get("translatedText", text)
-                self.cache[key] = translated
-                return translated
-            else:
-                return text
-        except Exception as e:
-            print(f"Translation error: {e}")
-            return text
-
-    def load_cache(self):
-        if os.path.exists(self.cache_file):
-            try:
-                with open(self.cache_file, "r", encoding="utf-8") as f:
-                    self.cache = json.load(f)
-            except Exception as e:
-                print(f"Failed to load translation cache: {e}")
-
-    def save_cache(self):
-        try:
-            with open(self.cache_file, "w", encoding="utf-8") as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Failed to save translation cache: {e}")
\ No newline at end of file
+"""UI text translation that never blocks the caller.
+
+smart_translate() only ever looks in memory: a miss returns the source
+text and queues the string, and the translation shows up on a later frame
+once a worker has fetched it.  Strings are sent to the backend in batches,
+a string already on its way is never requested twice, and every result is
+appended to a JSON Lines cache so each string is fetched only once, ever.
+
+The backend is anything with ``translate(texts, source, target) -> list``.
+The default speaks the LibreTranslate API at TRANSLATE_URL, which can point
+at a local server (``SNAKE_TRANSLATE_URL=http://localhost:5000/translate``)
+to work offline.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+TRANSLATE_URL = os.environ.get("SNAKE_TRANSLATE_URL", "https://libretranslate.com/translate")
+BATCH_SIZE = 32  # strings per backend request
+WORKERS = 4
+RETRY_AFTER_S = 30.0  # how long a failed string waits before it is asked for again
+
+
+class LibreTranslateBackend:
+    def __init__(self, url=TRANSLATE_URL, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def translate(self, texts, source, target):
+        import requests  # only needed once something is actually translated
+
+        resp = requests.post(
+            self.url,
+            json={"q": list(texts), "source": source, "target": target, "format": "text"},
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        translated = resp.json().get("translatedText", texts)
+        if isinstance(translated, str):  # servers that ignore batching
+            translated = [translated]
+        if len(translated) != len(texts):
+            raise ValueError(f"asked for {len(texts)} translations, got {len(translated)}")
+        return translated
+
+
+class LanguageManager:
+    def __init__(self, cache_file="translations.jsonl", source_lang="en", backend=None,
+                 legacy_cache_file="translations.json"):
+        self.source_lang = source_lang
+        self.target_lang = source_lang
+        self.cache_file = cache_file
+        self.legacy_cache_file = legacy_cache_file
+        self.backend = backend or LibreTranslateBackend()
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.file_lock = threading.Lock()
+        self.in_flight = {}  # cache key -> future of the batch fetching it
+        self.retry_at = {}
+        self.pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="translate")
+        self.load_cache()
+
+    def set_language(self, lang_code, texts=()):
+        """Switch language and start fetching ``texts`` (e.g. every UI string) right away."""
+        self.target_lang = lang_code
+        self.prefetch(texts)
+
+    def _cache_key(self, text, target=None):
+        # Key format: "en:fr:Text Here"
+        return f"{self.source_lang}:{target or self.target_lang}:{text}"
+
+    # --- Lookups ---
+    def smart_translate(self, text):
+        """The translation if it has arrived, else ``text`` (and fetch it)."""
+        if self.target_lang == self.source_lang:
+            return text
+        translated = self.cache.get(self._cache_key(text))
+        if translated is not None:
+            return translated
+        self.prefetch((text,))
+        return text
+
+    def prefetch(self, texts):
+        """Queue every string in ``texts`` not cached or on its way, in batches."""
+        target = self.target_lang
+        if target == self.source_lang:
+            return
+        now = time.monotonic()
+        with self.lock:
+            wanted = []
+            for text in dict.fromkeys(texts):
+                key = self._cache_key(text, target)
+                if key in self.cache or key in self.in_flight or self.retry_at.get(key, 0) > now:
+                    continue
+                wanted.append(text)
+            for i in range(0, len(wanted), BATCH_SIZE):
+                batch = wanted[i:i + BATCH_SIZE]
+                future = self.pool.submit(self._fetch, batch, target)
+                for text in batch:
+                    self.in_flight[self._cache_key(text, target)] = future
+
+    def wait(self, timeout=None):
+        """Block until everything queued so far has arrived or failed."""
+        with self.lock:
+            futures = set(self.in_flight.values())
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for future in futures:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                future.result(remaining)
+            except Exception:
+                pass
+
+    def _fetch(self, texts, target):
+        keys = [self._cache_key(text, target) for text in texts]
+        try:
+            translated = self.backend.translate(texts, self.source_lang, target)
+        except Exception as e:
+            print(f"Translation error: {e}")
+            with self.lock:
+                retry = time.monotonic() + RETRY_AFTER_S
+                for key in keys:
+                    self.in_flight.pop(key, None)
+                    self.retry_at[key] = retry
+            return
+        entries = dict(zip(keys, translated))
+        with self.lock:
+            self.cache.update(entries)
+            for key in keys:
+                self.in_flight.pop(key, None)
+                self.retry_at.pop(key, None)
+        self.append_cache(entries)
+
+    # --- Cache file ---
+    def load_cache(self):
+        """Read the cache, skipping a torn last line, and compact it if it is mostly duplicates."""
+        lines = 0
+        torn = False
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    for line in f:
+                        lines += 1
+                        torn = not line.endswith("\n")
+                        try:
+                            key, value = json.loads(line)
+                        except (ValueError, TypeError):
+                            continue
+                        self.cache[key] = value
+            except OSError as e:
+                print(f"Failed to load translation cache: {e}")
+        elif self.legacy_cache_file and os.path.exists(self.legacy_cache_file):
+            try:
+                with open(self.legacy_cache_file, "r", encoding="utf-8") as f:
+                    legacy = json.load(f)
+            except (OSError, ValueError):
+                legacy = {}  # the old cache was often left empty
+            if isinstance(legacy, dict) and legacy:
+                self.cache.update(legacy)
+                lines = 2 * len(legacy) + 1  # forces the rewrite below
+        # A torn line would swallow the next append, so rewrite that away too
+        if torn or lines > 2 * len(self.cache):
+            self.save_cache()
+
+    def append_cache(self, entries):
+        try:
+            with self.file_lock, open(self.cache_file, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps([key, value], ensure_ascii=False) + "\n"
+                                for key, value in entries.items()))
+        except OSError as e:
+            print(f"Failed to save translation cache: {e}")
+
+    def save_cache(self):
+        """Rewrite the cache with one line per string, atomically."""
+        tmp = self.cache_file + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                for key, value in self.cache.items():
+                    f.write(json.dumps([key, value], ensure_ascii=False) + "\n")
+            os.replace(tmp, self.cache_file)
+        except OSError as e:
+            print(f"Failed to save translation cache: {e}")
@@ -0,0 +1,204 @@
+"""Survival scores in an SQLite database.
+
+Every finished game is one row; nothing is ever rewritten, so a crash can
+at worst lose the game being saved.  The database runs in WAL mode, which
+lets any number of game instances read while one writes, and each insert
+is its own transaction, so two instances finishing at once both keep their
+score.  Indexes on score, player and date keep the top-N, personal-best and
+date-range queries fast however many games have been played.
+
+Each row carries a digest of its fields.  Rows edited by hand no longer
+match it and are left out of every query.  This only catches casual edits
+of the file, since the key ships with the game; scores that link a replay
+can be checked for real with ``python replay.py <file> --verify``.
+"""
+import hashlib
+import hmac
+import json
+import os
+import sqlite3
+import time
+
+DIGEST_KEY = b"snake-game leaderboard v1"
+BUSY_TIMEOUT_S = 5.0
+# Date ranges with more games than this may be ranked by walking
+# scores_rank instead of sorting them; see Leaderboard.between()
+DATE_SCAN_LIMIT = 5000
+RANGE_COUNT_LIMIT = 20000  # games counted to estimate a range's share of the table
+WALK_ROW_COST = 3  # a row read off scores_rank costs about three sorted by date
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id        INTEGER PRIMARY KEY,
+    name      TEXT    NOT NULL,
+    score     INTEGER NOT NULL,
+    time      INTEGER NOT NULL,
+    played_at REAL    NOT NULL,
+    replay    TEXT,
+    digest    TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_rank   ON scores (score DESC, time);
+CREATE INDEX IF NOT EXISTS scores_player ON scores (name, score DESC, time);
+CREATE INDEX IF NOT EXISTS scores_date   ON scores (played_at, score DESC);
+"""
+COLUMNS = "name, score, time, played_at, replay, digest"
+
+
+def digest(name, score, time_sec, played_at, replay):
+    message = json.dumps([name, score, time_sec, played_at, replay]).encode()
+    return hmac.new(DIGEST_KEY, message, hashlib.sha256).hexdigest()
+
+
+class Leaderboard:
+    """Survival scores stored at ``path``, opened on first use.
+
+    Entries are dicts with ``name``, ``score``, ``time`` (seconds survived),
+    ``played_at`` (Unix time) and, when the game was recorded, ``replay``.
+    Rankings order by score, then by the shorter survival time.  If the
+    database is new and ``legacy_json`` names the old JSON leaderboard,
+    its entries are imported once.
+    """
+
+    def __init__(self, path, legacy_json=None):
+        self.path = path
+        self.legacy_json = legacy_json
+        self.db = None
+
+    def connect(self):
+        if self.db is None:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_S, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")  # durable across crashes of the game, not of the OS
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                new = db.execute("SELECT name FROM sqlite_master WHERE name = 'scores'").fetchone() is None
+                for statement in SCHEMA.split(";"):
+                    if statement.strip():
+                        db.execute(statement)
+                if new:
+                    self.import_legacy(db)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                db.close()
+                raise
+            self.db = db
+        return self.db
+
+    def import_legacy(self, db):
+        if not self.legacy_json:
+            return
+        try:
+            with open(self.legacy_json, "r") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return  # missing, empty or damaged: nothing worth keeping
+        if not isinstance(entries, list):
+            return
+        played_at = os.path.getmtime(self.legacy_json)
+        for entry in entries:
+            try:
+                self.insert(db, str(entry["name"]), int(entry["score"]), int(entry["time"]),
+                            played_at, entry.get("replay"))
+            except (KeyError, TypeError, ValueError, AttributeError):
+                continue
+
+    @staticmethod
+    def insert(db, name, score, time_sec, played_at, replay):
+        db.execute(f"INSERT INTO scores ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                   (name, score, time_sec, played_at, replay,
+                    digest(name, score, time_sec, played_at, replay)))
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    # --- Writing ---
+    def add(self, name, score, time_sec, replay=None, played_at=None):
+        played_at = time.time() if played_at is None else played_at
+        self.insert(self.connect(), name, score, time_sec, played_at, replay)
+
+    def add_many(self, entries):
+        """Insert (name, score, time, played_at, replay) tuples in one transaction."""
+        db = self.connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for entry in entries:
+                self.insert(db, *entry)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    # --- Queries ---
+    def rows(self, where, params, order, n, source="scores", limit=-1, keep=None):
+        """Up to ``n`` genuine entries, reading the index only as far as needed.
+
+        At most ``limit`` rows are read, and only those whose played_at
+        passes ``keep`` are returned.
+        """
+        cursor = self.connect().execute(
+            f"SELECT {COLUMNS} FROM {source} {where} ORDER BY {order} LIMIT ?", params + (limit,))
+        found = []
+        for name, score, time_sec, played_at, replay, row_digest in cursor:
+            if keep is not None and not keep(played_at):
+                continue
+            if not hmac.compare_digest(row_digest, digest(name, score, time_sec, played_at, replay)):
+                continue
+            entry = {"name": name, "score": score, "time": time_sec, "played_at": played_at}
+            if replay:
+                entry["replay"] = replay
+            found.append(entry)
+            if len(found) == n:
+                break
+        cursor.close()
+        return found
+
+    def top(self, n=10):
+        return self.rows("", (), "score DESC, time", n)
+
+    def best(self, name, n=1):
+        """``name``'s own top ``n`` games."""
+        return self.rows("WHERE name = ?", (name,), "score DESC, time", n)
+
+    def between(self, start, end, n=10):
+        """Top ``n`` games played from ``start`` up to ``end`` (Unix times).
+
+        scores_date finds a range's games but not in rank order, so all of
+        them get sorted; that is fine for a day, not for months.  A range
+        holding a good share of the table instead has its top ``n`` near
+        the top of scores_rank, so that is walked, skipping other games,
+        for a few times as many rows as the share predicts, but only while
+        that is cheaper than the sort.  If the range's games rank lower
+        than predicted, the walk gives up and the range is sorted after all,
+        so a query costs at most about a third more than the sort alone and
+        never a pass over the whole table.
+        """
+        db = self.connect()
+        where = "WHERE played_at >= ? AND played_at < ?"
+        order = "score DESC, time"
+        games = db.execute(
+            f"SELECT COUNT(*) FROM (SELECT 1 FROM scores INDEXED BY scores_date {where} LIMIT ?)",
+            (start, end, RANGE_COUNT_LIMIT)).fetchone()[0]
+        if games > DATE_SCAN_LIMIT:
+            total = db.execute("SELECT MAX(id) FROM scores").fetchone()[0]
+            walk = 3 * n * total // games
+            if walk * WALK_ROW_COST < games:
+                found = self.rows("", (), order, n, "scores INDEXED BY scores_rank", walk,
+                                  keep=lambda played_at: start <= played_at < end)
+                if len(found) == n:
+                    return found
+        return self.rows(where, (start, end), order, n, "scores INDEXED BY scores_date")
+
+    def replays(self, top=10, recent=50):
+        """Replay paths linked from the ``top`` best games and the ``recent`` newest that have one."""
+        entries = self.top(top) + self.rows("WHERE replay IS NOT NULL", (), "played_at DESC", recent,
+                                            "scores INDEXED BY scores_date")
+        return {entry["replay"] for entry in entries if "replay" in entry}
+
+    def count(self):
+        return self.connect().execute("SELECT COUNT(*) FROM scores").fetchone()[0]
@@ -1,31 +1,38 @@
 import pygame
 import random
-import time
 import math
-import os
-import json
+import sqlite3
 import sys
-import glob
-
-# Fix: Import winsound only on Windows, else use a dummy function
-if os.name == "nt":
-    import winsound
-    def beep(freq, dur):
-        try:
-            winsound.Beep(freq, dur)
-        except RuntimeError:
-            pass
-else:
-    def beep(freq, dur):
-        pass
-
-pygame.init()
+from collections import OrderedDict
+
+import assets
+import engine
+import replay
+from leaderboard import Leaderboard
+from particles import ParticlePool, SQUARE
+from profile_store import ProfileStore
+from sound import AudioService
+from text_cache import TextCache
+from timestep import FixedTimestep
 
 # --- Constants ---
 WIDTH, HEIGHT = 700, 700
 SNAKE_SIZE = 32
 APPLE_SIZE = 22
-FPS = 10
+FPS = 10  # game ticks per second
+MIN_FPS, MAX_FPS = 5, 60  # the speeds settings_screen offers
+RENDER_FPS = 60  # frames per second while playing; positions are interpolated
+TURN_QUEUE_SIZE = 3  # arrow presses remembered for the following ticks
+REPLAY_DIR = "replays"
+LEADERBOARD_REPLAY_DIR = "replays/leaderboard"  # linked from scores; see update_leaderboard()
+SCREEN_SIZES = [(500, 500), (600, 600), (700, 700), (800, 600), (900, 700), (1000, 800)]
+
+KEY_DIRECTIONS = {
+    pygame.K_UP: engine.UP,
+    pygame.K_DOWN: engine.DOWN,
+    pygame.K_LEFT: engine.LEFT,
+    pygame.K_RIGHT: engine.RIGHT,
+}
 
 # --- Themes ---
 THEMES = {
@@ -74,161 +81,214 @@ THEMES = {
 theme_name = "Neon-Retro"
 theme = THEMES[theme_name]
 
+fonts = assets.FontRegistry()
+
 def get_theme_font(theme_name, size=36):
-    font_file = THEMES[theme_name].get("font")
-    if font_file:
-        font_path = os.path.join(
-            r"C:\Users\notye\OneDrive\Documents\Python Projects by me\snake-game\src\Fonts", font_file
-        )
-        try:
-            if os.path.exists(font_path):
-                return pygame.font.Font(font_path, size)
-            else:
-                print(f"Warning: Font file '{font_file}' not found. Using default font.")
-                return pygame.font.SysFont(None, size)
-        except Exception:
-            return pygame.font.SysFont(None, size)
-    else:
-        return pygame.font.SysFont(None, size)
+    return fonts.get(THEMES[theme_name].get("font"), size)
 
-font = get_theme_font(theme_name, 36)
 sound_on = True
 
+# --- Profile ---
+# High scores, settings and stats; saved in the background as they change
+profile = ProfileStore()
+
+def load_profile():
+    """Read the profile and apply its saved settings, before the window opens."""
+    global FPS, sound_on, WIDTH, HEIGHT
+    profile.load()
+    fps = profile.setting("fps", FPS)
+    # A hand-edited profile must not stall or divide the game clock by zero
+    if isinstance(fps, (int, float)) and not isinstance(fps, bool) and math.isfinite(fps):
+        FPS = min(MAX_FPS, max(MIN_FPS, round(fps)))
+    sound_on = profile.setting("sound", sound_on)
+    size = tuple(profile.setting("screen_size", (WIDTH, HEIGHT)))
+    if size in SCREEN_SIZES:
+        WIDTH, HEIGHT = size
+    if profile.setting("theme") in THEMES:
+        set_theme(profile.setting("theme"))
+
+def save_settings():
+    profile.update_settings(fps=FPS, theme=theme_name, sound=sound_on, screen_size=[WIDTH, HEIGHT])
+
 # --- Setup ---
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("SNAKE(X) by Ahmed Sajid")
-clock = pygame.time.Clock()
-def load_and_scale(path, size):
-    try:
-        img = pygame.image.load(path).convert_alpha()
-        # Maintain aspect ratio and center the image in a square surface
-        img_rect = img.get_rect()
-        scale_factor = min(size / img_rect.width, size / img_rect.height)
-        new_width = int(img_rect.width * scale_factor)
-        new_height = int(img_rect.height * scale_factor)
-        img = pygame.transform.smoothscale(img, (new_width, new_height))
-        surface = pygame.Surface((size, size), pygame.SRCALPHA)
-        surface.blit(img, ((size - new_width) // 2, (size - new_height) // 2))
-        return surface
-    except pygame.error as e:
-        print(f"Error loading image at '{path}': {e}")
-        return pygame.Surface((size, size), pygame.SRCALPHA)  # Transparent fallback
-
-snake_head_img = load_and_scale(
-    r"C:\Users\notye\OneDrive\Documents\Python Projects by me\snake-game\src\assets\images\snake_head.png", SNAKE_SIZE
-)
-snake_body_img = load_and_scale(
-    r"C:\Users\notye\OneDrive\Documents\Python Projects by me\snake-game\src\assets\images\snake_body.png", SNAKE_SIZE
-)
-apple_img = load_and_scale(
-    r"C:\Users\notye\OneDrive\Documents\Python Projects by me\snake-game\src\assets\images\food.png", APPLE_SIZE
-)
-bomb_img = load_and_scale(
-    r"C:\Users\notye\OneDrive\Documents\Python Projects by me\snake-game\src\assets\images\Bomb.png", SNAKE_SIZE + 10
-)
+# Importing this module only defines things; bootstrap() starts pygame,
+# opens the window and kicks off asset loading.
+screen = None
+clock = None
+font = None
+audio = None
+asset_manager = None
+
+# Loaded on a worker thread while startup_screen() shows progress; until
+# load_images() swaps them in these are transparent placeholders
+IMAGES = {
+    "snake_head_img": ("snake_head.png", SNAKE_SIZE),
+    "snake_body_img": ("snake_body.png", SNAKE_SIZE),
+    "apple_img": ("food.png", APPLE_SIZE),
+    "bomb_img": ("Bomb.png", SNAKE_SIZE + 10),
+}
+ASSETS_EVENT = pygame.USEREVENT + 2
+snake_head_img = snake_body_img = apple_img = bomb_img = None
+
+def bootstrap():
+    global screen, clock, font, audio, asset_manager
+    if screen is not None:
+        return
+    pygame.init()
+    load_profile()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("SNAKE(X) by Ahmed Sajid")
+    clock = pygame.time.Clock()
+    font = get_theme_font(theme_name, 36)
+    audio = AudioService()
+    asset_manager = assets.AssetManager()
+    asset_manager.preload(IMAGES.values(), on_progress=lambda: pygame.event.post(pygame.event.Event(ASSETS_EVENT)))
+    for global_name, (_, size) in IMAGES.items():
+        globals()[global_name] = pygame.Surface((size, size), pygame.SRCALPHA)
+    build_snake_variants()
+
+def load_images():
+    """Install the game images, waiting for the loader if it is still busy."""
+    for global_name, (file_name, size) in IMAGES.items():
+        globals()[global_name] = asset_manager.image(file_name, size)
+    build_snake_variants()
+    playfield.invalidate()
 
 # --- Leaderboard Management ---
-LEADERBOARD_FILE = "survival_leaderboard.json"
-def load_leaderboard():
-    if not os.path.exists(LEADERBOARD_FILE):
+LEADERBOARD_FILE = "survival_leaderboard.db"
+LEGACY_LEADERBOARD_FILE = "survival_leaderboard.json"  # imported once into the database
+LEADERBOARD_SIZE = 10
+leaderboard = Leaderboard(LEADERBOARD_FILE, legacy_json=LEGACY_LEADERBOARD_FILE)
+
+def load_leaderboard(n=LEADERBOARD_SIZE):
+    try:
+        return leaderboard.top(n)
+    except sqlite3.Error as e:
+        print(f"Error reading leaderboard: {e}")
         return []
-    with open(LEADERBOARD_FILE, "r") as f:
-        return json.load(f)
-def save_leaderboard(leaderboard):
-    with open(LEADERBOARD_FILE, "w") as f:
-        json.dump(leaderboard, f)
-def update_leaderboard(name, score, time_sec):
-    leaderboard = load_leaderboard()
-    leaderboard.append({"name": name, "score": score, "time": time_sec})
-    leaderboard = sorted(leaderboard, key=lambda x: (-x["score"], x["time"]))[:10]
-    save_leaderboard(leaderboard)
+
+def update_leaderboard(name, score, time_sec, replay_path=None):
+    # replay_path lets the score be re-checked with replay.py --verify
+    try:
+        leaderboard.add(name, score, time_sec, replay_path)
+    except sqlite3.Error as e:
+        print(f"Error saving score: {e}")
+        return
+    # Keep the replays of the scores on show and of the latest games only
+    try:
+        replay.prune(LEADERBOARD_REPLAY_DIR, leaderboard.replays(LEADERBOARD_SIZE, replay.MAX_REPLAYS))
+    except (sqlite3.Error, OSError) as e:
+        print(f"Error pruning replays: {e}")
 
 # --- Particle Effect ---
-particles = []
-class Particle:
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        angle = random.uniform(0, 2 * math.pi)
-        speed = random.uniform(2, 6)
-        self.vx = math.cos(angle) * speed
-        self.vy = math.sin(angle) * speed
-        self.life = random.randint(10, 20)
-        self.color = color
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.life -= 1
-    def draw(self, surface):
-        if self.life > 0:
-            pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), 4)
+PARTICLE_CAPACITY = 20000
+particles = ParticlePool(PARTICLE_CAPACITY)
+
+# Effects only emit particles and return when they are over; the frame
+# loop that started them keeps drawing, so input and music keep flowing.
+CRASH_EFFECT_MS = 1000
+EXPLOSION_EFFECT_MS = 600
+SCORE_EFFECT_MS = 330
+
 def particle_crash_effect(snake):
-    global particles
     for segment in snake:
-        for _ in range(12):
-            particles.append(Particle(segment[0] + SNAKE_SIZE // 2, segment[1] + SNAKE_SIZE // 2, theme["snake"]))
-    for _ in range(20):
-        screen.fill(theme["bg"])
-        for p in particles:
-            p.update()
-            p.draw(screen)
-        pygame.display.flip()
-        beep(1000, 100)
-    particles.clear()
+        particles.emit(segment[0] + SNAKE_SIZE // 2, segment[1] + SNAKE_SIZE // 2, theme["snake"], 12)
+    play_sound("crash")
+    return pygame.time.get_ticks() + CRASH_EFFECT_MS
+
+def bomb_explosion_effect(bomb_position):
+    particles.emit(bomb_position[0] + SNAKE_SIZE // 2, bomb_position[1] + SNAKE_SIZE // 2, (255, 60, 0), 40)
+    play_sound("bomb")
+    return pygame.time.get_ticks() + EXPLOSION_EFFECT_MS
 
 def play_sound(sound_type=None):
-    if not sound_on:
-        return
-    if sound_type == "eat":
-        beep(1000, 100)
-    elif sound_type == "gameover":
-        beep(300, 300)
+    if sound_on and sound_type:
+        audio.play(sound_type)
+
+text_cache = TextCache()
+
+# --- Screen Framework ---
+MUSIC_END_EVENT = pygame.USEREVENT + 1
+# Events after which a screen has to repaint itself
+REPAINT_EVENTS = (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, ASSETS_EVENT)
+
+def run_screen(draw, handle_event, frame_ms=None):
+    """Run a menu-style screen until ``handle_event`` returns something.
+
+    ``draw()`` paints the whole screen.  It runs once up front, after input
+    or a window expose, and every ``frame_ms`` for screens that animate;
+    otherwise the loop sleeps in pygame.event.wait(), so an idle menu uses
+    no CPU.  ``handle_event(event)`` returns None to stay on the screen and
+    any other value to leave with it.  Quit and music events are handled
+    here for every screen.
+    """
+    redraw = True
+    next_frame = pygame.time.get_ticks()
+    while True:
+        if redraw:
+            draw()
+            pygame.display.flip()
+            redraw = False
+        if frame_ms:
+            first = pygame.event.wait(max(1, next_frame - pygame.time.get_ticks()))
+        else:
+            first = pygame.event.wait()
+        for event in [first] + pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit(); exit()
+            elif event.type == MUSIC_END_EVENT:
+                play_next_music()
+            elif event.type != pygame.NOEVENT:
+                if event.type in REPAINT_EVENTS:
+                    redraw = True
+                result = handle_event(event)
+                if result is not None:
+                    return result
+        if frame_ms and pygame.time.get_ticks() >= next_frame:
+            next_frame = pygame.time.get_ticks() + frame_ms
+            redraw = True
+
+def menu_choice(event, buttons, selected):
+    """Button text picked by ``event`` (ENTER or a click), if any."""
+    if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
+        return buttons[selected][0]
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        for text, rect in buttons:
+            if rect.collidepoint(event.pos):
+                return text
+    return None
+
+def render_text(text, color):
+    return text_cache.render(font, text, color)
 
 def draw_button(rect, text, active=False):
     if active:
         pygame.draw.rect(screen, (80, 80, 180), rect.inflate(8, 8), border_radius=8)
     pygame.draw.rect(screen, (200, 200, 200) if active else (150, 150, 150), rect, border_radius=8)
-    label = font.render(text, True, theme["text"])
+    label = render_text(text, theme["text"])
     label_rect = label.get_rect(center=rect.center)
     screen.blit(label, label_rect)
 
-def draw_timer(start_ticks):
+def jitter_label(timestep):
+    """HUD label (toggled with F3) showing how evenly game ticks are spaced."""
+    mean, worst = timestep.jitter()
+    return (f"Tick jitter: {mean:.1f} ms (max {worst:.1f})", "bottomleft", (10, HEIGHT - 10))
+
+def format_timer(start_ticks):
     elapsed = (pygame.time.get_ticks() - start_ticks) // 1000
     mins = elapsed // 60
     secs = elapsed % 60
-    timer_label = font.render(f"Time: {mins:02}:{secs:02}", True, theme["text"])
-    screen.blit(timer_label, (WIDTH - timer_label.get_width() - 20, 10))
-
-def get_new_food_position(snake):
-    min_x = 0
-    max_x = WIDTH - SNAKE_SIZE
-    min_y = 0
-    max_y = HEIGHT - SNAKE_SIZE
-    while True:
-        pos = (
-            random.randrange(min_x, max_x + 1, SNAKE_SIZE),
-            random.randrange(min_y, max_y + 1, SNAKE_SIZE)
-        )
-        if pos not in snake:
-            return pos
-
-def is_on_apple(snake_head, food_position):
-    offset = (SNAKE_SIZE - APPLE_SIZE) // 2
-    apple_center = (food_position[0] + offset + APPLE_SIZE // 2, food_position[1] + offset + APPLE_SIZE // 2)
-    snake_center = (snake_head[0] + SNAKE_SIZE // 2, snake_head[1] + SNAKE_SIZE // 2)
-    return (abs(snake_center[0] - apple_center[0]) < SNAKE_SIZE // 2) and (abs(snake_center[1] - apple_center[1]) < SNAKE_SIZE // 2)
+    return f"Time: {mins:02}:{secs:02}"
 
-def is_on_bomb(snake_head, bomb_position):
-    offset = (SNAKE_SIZE + 10 - SNAKE_SIZE) // 2
-    bomb_center = (bomb_position[0] + offset + (SNAKE_SIZE + 10) // 2, bomb_position[1] + offset + (SNAKE_SIZE + 10) // 2)
-    snake_center = (snake_head[0] + SNAKE_SIZE // 2, snake_head[1] + SNAKE_SIZE // 2)
-    return (abs(snake_center[0] - bomb_center[0]) < SNAKE_SIZE // 2) and (abs(snake_center[1] - bomb_center[1]) < SNAKE_SIZE // 2)
+def current_board():
+    return engine.Board(WIDTH, HEIGHT, SNAKE_SIZE, APPLE_SIZE, SNAKE_SIZE + 10)
 
 def set_theme(new_theme_name):
     global theme_name, theme, font
     theme_name = new_theme_name
     theme = THEMES[theme_name]
     font = get_theme_font(theme_name, 36)
+    playfield.invalidate()
 
 # --- Main Game Functions (home_screen, settings_screen, etc.) ---
 # All UI text below should use English strings directly, e.g. "Settings", "Resume", etc.
@@ -246,35 +306,31 @@ def home_screen():
         ("Quit", pygame.Rect(60, 610, 240, 50)),
     ]
     selected = 1
-    while True:
+
+    def draw():
         screen.fill(theme["bg"])
         # Move the title to the left
-        title = font.render("SNAKE(X) BY AHMED SAJID", True, theme["text"])
+        title = render_text("SNAKE(X) BY AHMED SAJID", theme["text"])
         screen.blit(title, (30, 40))
         for i, (text, rect) in enumerate(buttons):
             draw_button(rect, text, active=(i == selected))
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    selected = (selected - 1) % len(buttons)
-                elif event.key == pygame.K_DOWN:
-                    selected = (selected + 1) % len(buttons)
-                elif event.key == pygame.K_RETURN:
-                    return buttons[selected][0]
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                for i, (text, rect) in enumerate(buttons):
-                    if rect.collidepoint(event.pos):
-                        return text
+
+    def handle(event):
+        nonlocal selected
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_UP:
+                selected = (selected - 1) % len(buttons)
+            elif event.key == pygame.K_DOWN:
+                selected = (selected + 1) % len(buttons)
+        return menu_choice(event, buttons, selected)
+
+    return run_screen(draw, handle)
 
 # --- Settings Screen ---
 def settings_screen():
-    global FPS, theme_name, theme, sound_on, font, WIDTH, HEIGHT, screen
     themes_list = list(THEMES.keys())
     theme_idx = themes_list.index(theme_name)
-    sizes = [(500, 500), (600, 600), (700, 700), (800, 600), (900, 700), (1000, 800)]
+    sizes = SCREEN_SIZES
     size_idx = [i for i, s in enumerate(sizes) if s == (WIDTH, HEIGHT)]
     size_idx = size_idx[0] if size_idx else 2  # Default to 700x700
     options = [
@@ -286,9 +342,10 @@ def settings_screen():
     ]
     selected = 0
     editing = False
-    while True:
+
+    def draw():
         screen.fill(theme["bg"])
-        title = font.render("Settings", True, theme["text"])
+        title = render_text("Settings", theme["text"])
         screen.blit(title, (WIDTH//2 - title.get_width()//2, 60))
         for i, opt in enumerate(options):
             y = 160 + i*80
@@ -305,60 +362,63 @@ def settings_screen():
             rect = pygame.Rect(WIDTH//2-150, y-10, 300, 60)
             if i == selected:
                 pygame.draw.rect(screen, (80, 80, 180), rect, border_radius=12)
-            label = font.render(f"{opt} {val}", True, (255,255,0) if i == selected else theme["text"])
+            label = render_text(f"{opt} {val}", (255,255,0) if i == selected else theme["text"])
             screen.blit(label, (WIDTH//2 - label.get_width()//2, y))
         if editing and options[selected] != "Back":
-            hint = font.render("Use LEFT/RIGHT to change, ENTER to confirm, ESC to cancel", True, theme["text"])
+            hint = render_text("Use LEFT/RIGHT to change, ENTER to confirm, ESC to cancel", theme["text"])
             screen.blit(hint, (WIDTH//2 - hint.get_width()//2, HEIGHT - 60))
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); exit()
-            elif event.type == pygame.KEYDOWN:
-                if not editing:
-                    if event.key == pygame.K_UP:
-                        selected = (selected - 1) % len(options)
-                    elif event.key == pygame.K_DOWN:
-                        selected = (selected + 1) % len(options)
-                    elif event.key == pygame.K_RETURN:
-                        if options[selected] == "Back":
-                            return
-                        else:
-                            editing = True
-                    elif event.key == pygame.K_ESCAPE:
-                        return
-                else:
-                    if event.key == pygame.K_LEFT:
-                        if options[selected] == "Speed (FPS):":
-                            FPS = max(5, FPS - 1)
-                        elif options[selected] == "Theme:":
-                            theme_idx = (theme_idx - 1) % len(themes_list)
-                            set_theme(themes_list[theme_idx])
-                        elif options[selected] == "Sound:":
-                            sound_on = not sound_on
-                        elif options[selected] == "Screen Size:":
-                            size_idx = (size_idx - 1) % len(sizes)
-                    elif event.key == pygame.K_RIGHT:
-                        if options[selected] == "Speed (FPS):":
-                            FPS = min(60, FPS + 1)
-                        elif options[selected] == "Theme:":
-                            theme_idx = (theme_idx + 1) % len(themes_list)
-                            set_theme(themes_list[theme_idx])
-                        elif options[selected] == "Sound:":
-                            sound_on = not sound_on
-                        elif options[selected] == "Screen Size:":
-                            size_idx = (size_idx + 1) % len(sizes)
-                    elif event.key == pygame.K_RETURN:
-                        if options[selected] == "Screen Size:":
-                            WIDTH, HEIGHT = sizes[size_idx]
-                            screen = pygame.display.set_mode((WIDTH, HEIGHT))
-                            global game_bg
-                            # game_bg = load_game_bg()  # Removed: load_game_bg is not defined
-                        editing = False
-                    elif event.key == pygame.K_ESCAPE:
-                        editing = False
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                return
+
+    def handle(event):
+        global FPS, sound_on, WIDTH, HEIGHT, screen
+        nonlocal selected, editing, theme_idx, size_idx
+        if event.type == pygame.KEYDOWN:
+            if not editing:
+                if event.key == pygame.K_UP:
+                    selected = (selected - 1) % len(options)
+                elif event.key == pygame.K_DOWN:
+                    selected = (selected + 1) % len(options)
+                elif event.key == pygame.K_RETURN:
+                    if options[selected] == "Back":
+                        return True
+                    else:
+                        editing = True
+                elif event.key == pygame.K_ESCAPE:
+                    return True
+            else:
+                if event.key == pygame.K_LEFT:
+                    if options[selected] == "Speed (FPS):":
+                        FPS = max(MIN_FPS, FPS - 1)
+                    elif options[selected] == "Theme:":
+                        theme_idx = (theme_idx - 1) % len(themes_list)
+                        set_theme(themes_list[theme_idx])
+                    elif options[selected] == "Sound:":
+                        sound_on = not sound_on
+                    elif options[selected] == "Screen Size:":
+                        size_idx = (size_idx - 1) % len(sizes)
+                elif event.key == pygame.K_RIGHT:
+                    if options[selected] == "Speed (FPS):":
+                        FPS = min(MAX_FPS, FPS + 1)
+                    elif options[selected] == "Theme:":
+                        theme_idx = (theme_idx + 1) % len(themes_list)
+                        set_theme(themes_list[theme_idx])
+                    elif options[selected] == "Sound:":
+                        sound_on = not sound_on
+                    elif options[selected] == "Screen Size:":
+                        size_idx = (size_idx + 1) % len(sizes)
+                elif event.key == pygame.K_RETURN:
+                    if options[selected] == "Screen Size:":
+                        WIDTH, HEIGHT = sizes[size_idx]
+                        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+                        playfield.invalidate()
+                    editing = False
+                elif event.key == pygame.K_ESCAPE:
+                    editing = False
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            return True
+        return None
+
+    run_screen(draw, handle)
+    save_settings()
 
 # --- Feedback Screen ---
 def feedback_screen():
@@ -370,19 +430,21 @@ def feedback_screen():
         "",
         "Press any key or click to return."
     ]
-    while True:
+
+    def draw():
         screen.fill(theme["bg"])
         y = 180
         for line in info:
-            label = font.render(line, True, theme["text"])
+            label = render_text(line, theme["text"])
             screen.blit(label, (WIDTH//2 - label.get_width()//2, y))
             y += 50
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); exit()
-            elif event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
-                return
+
+    def handle(event):
+        if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
+            return True
+        return None
+
+    run_screen(draw, handle)
 
 # --- Help and Licensing Screen ---
 def help_and_licensing_screen():
@@ -408,86 +470,93 @@ def help_and_licensing_screen():
     scroll_offset = 0
     line_height = 30
     max_offset = max(0, len(instructions) * line_height - HEIGHT + 40)
-    while True:
+
+    def draw():
         screen.fill(theme["bg"])
         y = 40 - scroll_offset
         for line in instructions:
-            label = font.render(line, True, theme["text"])
+            label = render_text(line, theme["text"])
             screen.blit(label, (30, y))
             y += line_height
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_DOWN:
-                    scroll_offset = min(scroll_offset + line_height, max_offset)
-                elif event.key == pygame.K_UP:
-                    scroll_offset = max(scroll_offset - line_height, 0)
-                else:
-                    return
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                return
+
+    def handle(event):
+        nonlocal scroll_offset
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_DOWN:
+                scroll_offset = min(scroll_offset + line_height, max_offset)
+            elif event.key == pygame.K_UP:
+                scroll_offset = max(scroll_offset - line_height, 0)
+            else:
+                return True
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            return True
+        return None
+
+    run_screen(draw, handle)
 
 # --- Leaderboard Screen ---
 def leaderboard_screen():
-    leaderboard = load_leaderboard()
-    screen.fill(theme["bg"])
-    title = font.render("Survival Leaderboard", True, theme["text"])
-    screen.blit(title, (WIDTH//2 - title.get_width()//2, 60))
-    y = 120
-    header = font.render("Rank  Name         Score   Time(s)", True, theme["text"])
-    screen.blit(header, (WIDTH//2 - header.get_width()//2, y))
-    y += 40
-    for idx, entry in enumerate(leaderboard):
-        line = f"{idx+1:>2}. {entry['name'][:10]:<10}   {entry['score']:<5}   {entry['time']:<5}"
-        label = font.render(line, True, theme["text"])
-        screen.blit(label, (WIDTH//2 - label.get_width()//2, y))
-        y += 35
-    if not leaderboard:
-        label = font.render("No records yet.", True, theme["text"])
-        screen.blit(label, (WIDTH//2 - label.get_width()//2, y))
-    prompt = font.render("Press any key or click to return.", True, theme["text"])
-    screen.blit(prompt, (WIDTH//2 - prompt.get_width()//2, HEIGHT - 60))
-    pygame.display.flip()
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type in (pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
-                waiting = False
+    entries = load_leaderboard()
+
+    def draw():
+        screen.fill(theme["bg"])
+        title = render_text("Survival Leaderboard", theme["text"])
+        screen.blit(title, (WIDTH//2 - title.get_width()//2, 60))
+        y = 120
+        header = render_text("Rank  Name         Score   Time(s)", theme["text"])
+        screen.blit(header, (WIDTH//2 - header.get_width()//2, y))
+        y += 40
+        for idx, entry in enumerate(entries):
+            line = f"{idx+1:>2}. {entry['name'][:10]:<10}   {entry['score']:<5}   {entry['time']:<5}"
+            label = render_text(line, theme["text"])
+            screen.blit(label, (WIDTH//2 - label.get_width()//2, y))
+            y += 35
+        if not entries:
+            label = render_text("No records yet.", theme["text"])
+            screen.blit(label, (WIDTH//2 - label.get_width()//2, y))
+        prompt = render_text("Press any key or click to return.", theme["text"])
+        screen.blit(prompt, (WIDTH//2 - prompt.get_width()//2, HEIGHT - 60))
+
+    def handle(event):
+        if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
+            return True
+        return None
+
+    run_screen(draw, handle)
 
 # --- Challenges Screen ---
 def challenges_screen():
     buttons = [
-        ("Survival Mode", pygame.Rect(WIDTH//2-120, 220, 240, 60)),
-        ("Back", pygame.Rect(WIDTH//2-120, 320, 240, 60)),
+        ("Survival Mode", pygame.Rect(WIDTH//2-120, 200, 240, 60)),
+        ("Giant Board", pygame.Rect(WIDTH//2-120, 280, 240, 60)),
+        ("Back", pygame.Rect(WIDTH//2-120, 360, 240, 60)),
     ]
     selected = 0
-    while True:
+
+    def draw():
         screen.fill(theme["bg"])
-        title = font.render("Challenges", True, theme["text"])
+        title = render_text("Challenges", theme["text"])
         screen.blit(title, (WIDTH//2 - title.get_width()//2, 120))
         for i, (text, rect) in enumerate(buttons):
             draw_button(rect, text, active=(i == selected))
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP or event.key == pygame.K_DOWN:
-                    selected = 1 - selected
-                elif event.key == pygame.K_RETURN:
-                    if buttons[selected][0] == "Survival Mode":
-                        survival_mode()
-                    elif buttons[selected][0] == "Back":
-                        return
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                for i, (text, rect) in enumerate(buttons):
-                    if rect.collidepoint(event.pos):
-                        if text == "Survival Mode":
-                            survival_mode()
-                        elif text == "Back":
-                            return
+
+    def handle(event):
+        nonlocal selected
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_UP:
+                selected = (selected - 1) % len(buttons)
+            elif event.key == pygame.K_DOWN:
+                selected = (selected + 1) % len(buttons)
+        choice = menu_choice(event, buttons, selected)
+        if choice == "Survival Mode":
+            survival_mode()
+        elif choice == "Giant Board":
+            giant_mode()
+        elif choice == "Back":
+            return True
+        return None
+
+    run_screen(draw, handle)
 
 # --- Pause Screen ---
 def pause_screen():
@@ -496,86 +565,112 @@ def pause_screen():
         ("Return to Menu", pygame.Rect(WIDTH//2-100, 390, 200, 50)),
     ]
     selected = 0
-    while True:
+
+    def draw():
         screen.fill(theme["bg"])
-        title = font.render("Paused", True, (0, 0, 200))
+        title = render_text("Paused", (0, 0, 200))
         screen.blit(title, (WIDTH//2 - title.get_width()//2, 120))
         for i, (text, rect) in enumerate(buttons):
             draw_button(rect, text, active=(i == selected))
-        info = font.render("Press 'R' to Resume", True, theme["text"])
+        info = render_text("Press 'R' to Resume", theme["text"])
         screen.blit(info, (WIDTH//2 - info.get_width()//2, 250))
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP or event.key == pygame.K_DOWN:
-                    selected = 1 - selected
-                elif event.key == pygame.K_RETURN:
-                    return buttons[selected][0]
-                elif event.key == pygame.K_r:
-                    return "Resume"
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                for i, (text, rect) in enumerate(buttons):
-                    if rect.collidepoint(event.pos):
-                        return text
+
+    def handle(event):
+        nonlocal selected
+        if event.type == pygame.KEYDOWN:
+            if event.key in (pygame.K_UP, pygame.K_DOWN):
+                selected = 1 - selected
+            elif event.key == pygame.K_r:
+                return "Resume"
+        return menu_choice(event, buttons, selected)
+
+    return run_screen(draw, handle)
 
 # --- End Game Screen ---
-def end_game_screen(score, high_score):
+def end_game_screen(score, high_score, won=False):
     buttons = [
         ("Play Again", pygame.Rect(WIDTH//2-100, 320, 200, 50)),
         ("Return to Menu", pygame.Rect(WIDTH//2-100, 390, 200, 50)),
     ]
     selected = 0
-    while True:
+
+    def draw():
         screen.fill(theme["bg"])
-        title = font.render("SNAKE(X) - You Lost", True, (200, 0, 0))
+        if won:
+            title = render_text("SNAKE(X) - Board Cleared!", (0, 200, 0))
+        else:
+            title = render_text("SNAKE(X) - You Lost", (200, 0, 0))
         screen.blit(title, (WIDTH//2 - title.get_width()//2, 120))
-        score_label = font.render(f"Your Score: {score}", True, theme["text"])
+        score_label = render_text(f"Your Score: {score}", theme["text"])
         screen.blit(score_label, (WIDTH//2 - score_label.get_width()//2, 180))
-        high_label = font.render(f"High Score: {high_score}", True, theme["text"])
+        high_label = render_text(f"High Score: {high_score}", theme["text"])
         screen.blit(high_label, (WIDTH//2 - high_label.get_width()//2, 230))
         for i, (text, rect) in enumerate(buttons):
             draw_button(rect, text, active=(i == selected))
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP or event.key == pygame.K_DOWN:
-                    selected = 1 - selected
-                elif event.key == pygame.K_RETURN:
-                    return buttons[selected][0]
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                for i, (text, rect) in enumerate(buttons):
-                    if rect.collidepoint(event.pos):
-                        return text
+
+    def handle(event):
+        nonlocal selected
+        if event.type == pygame.KEYDOWN and event.key in (pygame.K_UP, pygame.K_DOWN):
+            selected = 1 - selected
+        return menu_choice(event, buttons, selected)
+
+    return run_screen(draw, handle)
+
+# --- Name Entry Screen ---
+def name_entry_screen():
+    name = ""
+
+    def draw():
+        screen.fill(theme["bg"])
+        msg = render_text("Game Over! Enter Name:", theme["text"])
+        screen.blit(msg, (WIDTH//2 - msg.get_width()//2, HEIGHT//2 - 60))
+        name_label = render_text(name + "_", theme["text"])
+        screen.blit(name_label, (WIDTH//2 - name_label.get_width()//2, HEIGHT//2))
+
+    def handle(event):
+        nonlocal name
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_RETURN and name:
+                return name
+            elif event.key == pygame.K_BACKSPACE:
+                name = name[:-1]
+            elif event.unicode.isalnum() and len(name) < 10:
+                name += event.unicode
+        return None
+
+    return run_screen(draw, handle)
 
 # --- Startup Screen ---
 def startup_screen():
     fade_surface = pygame.Surface((WIDTH, HEIGHT))
     fade_surface.fill((0, 0, 0))
-    alpha = 255
-    show = True
-    while show:
+
+    def draw():
         screen.fill(theme["bg"])
-        title = font.render("SNAKE(X) BY AHMED SAJID", True, theme["text"])
-        prompt = font.render("PRESS ENTER", True, theme["text"])
+        title = render_text("SNAKE(X) BY AHMED SAJID", theme["text"])
         screen.blit(title, (WIDTH//2 - title.get_width()//2, HEIGHT//2 - 60))
-        screen.blit(prompt, (WIDTH//2 - prompt.get_width()//2, HEIGHT//2 + 10))
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN:
-                    for alpha in range(0, 256, 16):
-                        fade_surface.set_alpha(alpha)
-                        screen.blit(fade_surface, (0, 0))
-                        pygame.display.flip()
-                        pygame.time.delay(20)
-                    show = False
-                    break
+        if asset_manager.done:
+            prompt = render_text("PRESS ENTER", theme["text"])
+            screen.blit(prompt, (WIDTH//2 - prompt.get_width()//2, HEIGHT//2 + 10))
+        else:
+            bar = pygame.Rect(WIDTH//2 - 120, HEIGHT//2 + 20, 240, 16)
+            pygame.draw.rect(screen, theme["text"], bar, 2)
+            fill = bar.inflate(-6, -6)
+            fill.width = int(fill.width * asset_manager.progress)
+            pygame.draw.rect(screen, theme["snake"], fill)
+
+    def handle(event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
+            load_images()
+            for alpha in range(0, 256, 16):
+                fade_surface.set_alpha(alpha)
+                screen.blit(fade_surface, (0, 0))
+                pygame.display.flip()
+                pygame.time.delay(20)
+            return True
+        return None
+
+    run_screen(draw, handle)
 
 # --- Bomb Logic ---
 def draw_bomb(position):
@@ -584,161 +679,243 @@ def draw_bomb(position):
 
 # --- Survival Mode ---
 def survival_mode():
-    snake, direction, food_position, score = reset_game()
+    state = reset_game(bombs=True)
+    recorder = replay.Recorder(state, FPS)
+    replay_path = None
     running = True
+    playfield.invalidate()
     start_ticks = pygame.time.get_ticks()
-    particles = []
-    bomb_position = None
-    bomb_lifetime = 0
+    particles.clear()
     survival_time = 0
-
-    def wrap_position(pos):
-        return (pos[0] % WIDTH, pos[1] % HEIGHT)
-
-    def get_new_bomb_position(snake, food_position):
-        min_x = 0
-        max_x = WIDTH - SNAKE_SIZE
-        min_y = 0
-        max_y = HEIGHT - SNAKE_SIZE
-        while True:
-            pos = (
-                random.randrange(min_x, max_x + 1, SNAKE_SIZE),
-                random.randrange(min_y, max_y + 1, SNAKE_SIZE)
-            )
-            if pos not in snake and pos != food_position:
-                return pos
+    timestep = FixedTimestep(FPS)
+    turns = engine.TurnQueue(TURN_QUEUE_SIZE)
+    show_jitter = False
 
     while running:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit(); exit()
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP and direction != (0, SNAKE_SIZE):
-                    direction = (0, -SNAKE_SIZE)
-                elif event.key == pygame.K_DOWN and direction != (0, -SNAKE_SIZE):
-                    direction = (0, SNAKE_SIZE)
-                elif event.key == pygame.K_LEFT and direction != (SNAKE_SIZE, 0):
-                    direction = (-SNAKE_SIZE, 0)
-                elif event.key == pygame.K_RIGHT and direction != (-SNAKE_SIZE, 0):
-                    direction = (SNAKE_SIZE, 0)
+                if event.key in KEY_DIRECTIONS:
+                    turns.push(KEY_DIRECTIONS[event.key])
+                elif event.key == pygame.K_F3:
+                    show_jitter = not show_jitter
+                elif not state.alive:
+                    continue  # the death effect plays out so the game is always recorded
                 elif event.key == pygame.K_ESCAPE:
                     running = False
 
-        # Bomb logic: spawn new bomb if needed, decrement lifetime, remove if expired
-        if bomb_position is None or bomb_lifetime <= 0 or bomb_position == food_position or bomb_position in snake:
-            bomb_position = get_new_bomb_position(snake, food_position)
-            bomb_lifetime = random.randint(80, 160)
-        else:
-            bomb_lifetime -= 1
-
-        new_head = wrap_position((snake[0][0] + direction[0], snake[0][1] + direction[1]))
-
-        # --- Bomb collision: snake dies if touches bomb ---
-        if is_on_bomb(new_head, bomb_position):
-            # Explosion particle effect
-            for _ in range(40):
-                particles.append(Particle(
-                    bomb_position[0] + SNAKE_SIZE // 2,
-                    bomb_position[1] + SNAKE_SIZE // 2,
-                    (255, 60, 0)
-                ))
-            for _ in range(20):
-                screen.fill(theme["bg"])
-                draw_grid()
-                draw_snake(snake)
-                draw_food(food_position)
-                draw_bomb(bomb_position)
-                for p in particles:
-                    p.update()
-                    p.draw(screen)
-                pygame.display.flip()
-                beep(1200, 40)
-                pygame.time.delay(30)
+        now = pygame.time.get_ticks()
+        if state.alive:
+            for _ in range(timestep.advance(now)):
+                engine.step(state, turns.pop(state.direction))
+                recorder.record(state)
+                if not state.alive:
+                    break
+            survival_time = (now - start_ticks) // 1000
+            if not state.alive:
+                # Every survival game becomes a leaderboard row linking its replay
+                replay_path = save_replay(recorder, LEADERBOARD_REPLAY_DIR, limit=None)
+                # Let the explosion or crash play out before asking for a name
+                if state.death_cause == engine.DEATH_BOMB:
+                    effect_until = bomb_explosion_effect(state.bomb)
+                elif not state.won:
+                    effect_until = particle_crash_effect(state.snake)
+                else:
+                    effect_until = now
+        elif now >= effect_until:
             particles.clear()
-            survival_time = (pygame.time.get_ticks() - start_ticks) // 1000
-            name = ""
-            input_active = True
-            while input_active:
-                screen.fill(theme["bg"])
-                msg = font.render("Game Over! Enter Name:", True, theme["text"])
-                screen.blit(msg, (WIDTH//2 - msg.get_width()//2, HEIGHT//2 - 60))
-                name_label = font.render(name + "_", True, theme["text"])
-                screen.blit(name_label, (WIDTH//2 - name_label.get_width()//2, HEIGHT//2))
-                pygame.display.flip()
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        pygame.quit(); exit()
-                    elif event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_RETURN and name:
-                            input_active = False
-                        elif event.key == pygame.K_BACKSPACE:
-                            name = name[:-1]
-                        elif event.unicode.isalnum() and len(name) < 10:
-                            name += event.unicode
-            update_leaderboard(name, score, survival_time)
-            return
-
-        # Usual wall/self collision
-        if new_head in snake:
-            particle_crash_effect(snake)
-            time.sleep(0.5)
-            survival_time = (pygame.time.get_ticks() - start_ticks) // 1000
-            name = ""
-            input_active = True
-            while input_active:
-                screen.fill(theme["bg"])
-                msg = font.render("Game Over! Enter Name:", True, theme["text"])
-                screen.blit(msg, (WIDTH//2 - msg.get_width()//2, HEIGHT//2 - 60))
-                name_label = font.render(name + "_", True, theme["text"])
-                screen.blit(name_label, (WIDTH//2 - name_label.get_width()//2, HEIGHT//2))
-                pygame.display.flip()
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        pygame.quit(); exit()
-                    elif event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_RETURN and name:
-                            input_active = False
-                        elif event.key == pygame.K_BACKSPACE:
-                            name = name[:-1]
-                        elif event.unicode.isalnum() and len(name) < 10:
-                            name += event.unicode
-            update_leaderboard(name, score, survival_time)
+            profile.record_game("survival", state.score, state.score // engine.APPLE_POINTS,
+                                len(state.snake), survival_time)
+            name = name_entry_screen()
+            update_leaderboard(name, state.score, survival_time, replay_path)
             return
+        particles.update()
+
+        hud = [
+            (f"Score: {state.score}", "topleft", (10, 10)),
+            (f"Length: {len(state.snake)}", "topleft", (10, 40)),
+            (f"Survival: {survival_time}s", "topright", (WIDTH - 20, 10)),
+        ]
+        if show_jitter:
+            hud.append(jitter_label(timestep))
+        playfield.draw(state, hud, particles, timestep.alpha)
+        clock.tick(RENDER_FPS)
+
+# --- Giant Board Mode ---
+def giant_mode():
+    """Classic rules on a GIANT_BOARD_CELLS board, scrolled to follow the head."""
+    board = giant_board()
+    while True:
+        state = engine.new_game(board, direction=engine.UP, seed=random.getrandbits(64))
+        recorder = replay.Recorder(state, FPS)
+        world.invalidate()
+        start_ticks = pygame.time.get_ticks()
+        timestep = FixedTimestep(FPS)
+        turns = engine.TurnQueue(TURN_QUEUE_SIZE)
+        show_jitter = False
 
-        snake.insert(0, new_head)
+        while state.alive:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit(); exit()
+                elif event.type == pygame.KEYDOWN:
+                    if event.key in KEY_DIRECTIONS:
+                        turns.push(KEY_DIRECTIONS[event.key])
+                    elif event.key == pygame.K_F3:
+                        show_jitter = not show_jitter
+                    elif event.key == pygame.K_ESCAPE:
+                        playfield.invalidate()
+                        return
 
-        if is_on_apple(snake[0], food_position):
-            score += 10
-            food_position = get_new_food_position(snake)
-            # Make sure bomb doesn't overlap with new food
-            if bomb_position == food_position:
-                bomb_position = get_new_bomb_position(snake, food_position)
-        else:
-            snake.pop()
+            for _ in range(timestep.advance(pygame.time.get_ticks())):
+                engine.step(state, turns.pop(state.direction))
+                recorder.record(state)
+                if not state.alive:
+                    break
+                if state.ate:
+                    play_sound('eat')
+
+            hud = [
+                (f"Score: {state.score}", "topleft", (10, 10)),
+                (f"Length: {len(state.snake)}", "topleft", (10, 40)),
+                (format_timer(start_ticks), "topright", (WIDTH - 20, 10)),
+            ]
+            if show_jitter:
+                hud.append(jitter_label(timestep))
+            world.draw(state, hud, timestep.alpha)
+            clock.tick(RENDER_FPS)
+
+        save_replay(recorder, mode="giant")
+        if not state.won:
+            play_sound('gameover')
+        high_score = profile.high_score("giant")
+        if profile.record_game("giant", state.score, state.score // engine.APPLE_POINTS,
+                               len(state.snake), state.tick / FPS):
+            high_score = state.score
+        result = end_game_screen(state.score, high_score, won=state.won)
+        playfield.invalidate()
+        if result != "Play Again":
+            return
 
-        screen.fill(theme["bg"])
-        draw_grid()
-        draw_snake(snake)
-        draw_food(food_position)
-        if bomb_position:
-            draw_bomb(bomb_position)
-        score_label = font.render(f"Score: {score}", True, theme["text"])
-        score_pos = (10, 10)
-        screen.blit(score_label, score_pos)
-        length_label = font.render(f"Length: {len(snake)}", True, theme["text"])
-        screen.blit(length_label, (10, 40))
-        survival_time = (pygame.time.get_ticks() - start_ticks) // 1000
-        timer_label = font.render(f"Survival: {survival_time}s", True, theme["text"])
-        screen.blit(timer_label, (WIDTH - timer_label.get_width() - 20, 10))
+# --- Snake Pieces ---
+# The head and body images point up.  Every rotation the snake needs (the
+# head facing each way, the body running each way, a tapered tail and a
+# corner for each turn) is made here when the images are loaded, so drawing
+# never rotates anything.  Keys are ("head" | "body" | "tail", direction)
+# and ("corner", direction in, direction out); snake_pieces_by_way maps
+# (direction in, direction out) to the body, corner or, for None in, tail.
+snake_variants = {}
+snake_pieces_by_way = {}
+ANGLES = {engine.UP: 0, engine.LEFT: 90, engine.DOWN: 180, engine.RIGHT: -90}
+# The edge of a cell a move in each direction leaves through, as two corners
+EDGES = {
+    engine.UP: ((0, 0), (1, 0)),
+    engine.DOWN: ((0, 1), (1, 1)),
+    engine.LEFT: ((0, 0), (0, 1)),
+    engine.RIGHT: ((1, 0), (1, 1)),
+}
 
-        pygame.display.flip()
-        clock.tick(FPS)
+def masked(img, points):
+    """A copy of ``img`` showing only the polygon ``points``."""
+    mask = pygame.Surface(img.get_size(), pygame.SRCALPHA)
+    pygame.draw.polygon(mask, (255, 255, 255, 255), points)
+    img = img.copy()
+    img.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+    return img
+
+def build_snake_variants():
+    size = snake_body_img.get_width()
+    tail = masked(snake_body_img, [(0, 0), (size, 0), (size * 3 // 4, size), (size // 4, size)])
+    snake_variants.clear()
+    for direction, angle in ANGLES.items():
+        snake_variants["head", direction] = pygame.transform.rotate(snake_head_img, angle)
+        snake_variants["body", direction] = pygame.transform.rotate(snake_body_img, angle)
+        snake_variants["tail", direction] = pygame.transform.rotate(tail, angle)
+    for way_in in ANGLES:
+        for way_out in ANGLES:
+            if way_in == way_out or engine.is_reverse(way_in, way_out):
+                continue
+            # Split the cell along the diagonal between the edge the body
+            # comes in through and the edge it leaves through
+            entry = {(1 - x, 1 - y) for x, y in EDGES[way_in]}
+            exit_ = set(EDGES[way_out])
+            far = ({(0, 0), (1, 0), (0, 1), (1, 1)} - entry - exit_).pop()
+            scale = lambda corners: [(x * size, y * size) for x, y in corners]
+            corner = masked(snake_variants["body", way_out], scale(list(exit_) + [far]))
+            corner.blit(masked(snake_variants["body", way_in], scale(list(entry) + [far])), (0, 0))
+            snake_variants["corner", way_in, way_out] = corner
+    snake_pieces_by_way.clear()
+    for way_out in ANGLES:
+        snake_pieces_by_way[None, way_out] = snake_variants["tail", way_out]
+        for way_in in ANGLES:
+            snake_pieces_by_way[way_in, way_out] = snake_variants.get(
+                ("corner", way_in, way_out), snake_variants["body", way_out])
+
+def heading(board, start, end):
+    """The direction of the step from ``start`` to ``end``, across the wrap if that is shorter."""
+    dx = (end[0] - start[0] + board.width // 2) % board.width - board.width // 2
+    dy = (end[1] - start[1] + board.height // 2) % board.height - board.height // 2
+    if abs(dx) >= abs(dy):
+        return engine.RIGHT if dx > 0 else engine.LEFT
+    return engine.DOWN if dy > 0 else engine.UP
+
+class Headings(dict):
+    """heading() by (dx, dy) between cells; a board has only a few distinct steps."""
+
+    def __init__(self, board):
+        super().__init__()
+        self.board = board
+
+    def __missing__(self, step):
+        way = self[step] = heading(self.board, (0, 0), step)
+        return way
+
+headings = {}
+
+def board_headings(board):
+    key = (board.width, board.height, board.cell)
+    if key not in headings:
+        headings[key] = Headings(board)
+    return headings[key]
+
+def snake_piece(board, ahead, pos, behind):
+    """The image for the segment at ``pos``, between the one ``ahead`` of it and the one ``behind``."""
+    way_in = None if behind is None or behind == pos else heading(board, behind, pos)
+    return snake_pieces_by_way[way_in, heading(board, pos, ahead)]
+
+def snake_pieces(board, snake, behind_tail=None):
+    """(image, pos) for every segment but the head; ``behind_tail`` is where the tail came from."""
+    cells = list(snake)
+    if len(cells) < 2:
+        return []
+    # ways[i] is the step from cells[i + 1] to cells[i]: the way out of the
+    # segment behind and the way into the one ahead
+    steps = board_headings(board)
+    ways = [steps[ax - bx, ay - by] for (ax, ay), (bx, by) in zip(cells, cells[1:])]
+    ways.append(None if behind_tail is None or behind_tail == cells[-1] else heading(board, behind_tail, cells[-1]))
+    return [(snake_pieces_by_way[ways[i], ways[i - 1]], cells[i]) for i in range(1, len(cells))]
+
+def head_piece(state):
+    return snake_variants["head", state.direction]
+
+def tail_piece(state):
+    """The tail sliding out of the cell it is leaving, pointing the way it moves."""
+    snake = state.snake
+    if state.prev_tail is not None and state.prev_tail != snake[-1]:
+        return snake_variants["tail", heading(state.board, state.prev_tail, snake[-1])]
+    if len(snake) > 1:
+        return snake_variants["tail", heading(state.board, snake[-1], snake[-2])]
+    return snake_variants["tail", state.direction]
 
 # --- Drawing Functions ---
 def draw_snake(snake):
-    for i, segment in enumerate(snake):
-        img = snake_head_img if i == 0 else snake_body_img
-        screen.blit(img, segment)
+    """The whole snake in one blits call, head last so it stays on top."""
+    board = current_board()
+    pieces = snake_pieces(board, snake)
+    direction = heading(board, snake[1], snake[0]) if len(snake) > 1 else engine.UP
+    pieces.append((snake_variants["head", direction], snake[0]))
+    screen.blits(pieces, doreturn=False)
 
 def draw_food(position):
     offset = (SNAKE_SIZE - APPLE_SIZE) // 2
@@ -748,12 +925,14 @@ def draw_bomb(position):
     offset = (SNAKE_SIZE + 10 - SNAKE_SIZE) // 2
     screen.blit(bomb_img, (position[0] - offset, position[1] - offset))
 
-def draw_grid():
-    grid_color = (50, 50, 80)
+GRID_COLOR = (50, 50, 80)
+
+def draw_grid(surface=None):
+    surface = surface or screen
     for x in range(0, WIDTH, SNAKE_SIZE):
-        pygame.draw.line(screen, grid_color, (x, 0), (x, HEIGHT))
+        pygame.draw.line(surface, GRID_COLOR, (x, 0), (x, HEIGHT))
     for y in range(0, HEIGHT, SNAKE_SIZE):
-        pygame.draw.line(screen, grid_color, (0, y), (WIDTH, y))
+        pygame.draw.line(surface, GRID_COLOR, (0, y), (WIDTH, y))
     scale = 0.25
     block = int(SNAKE_SIZE * scale)
     line1 = "SNAKE(X)"
@@ -765,110 +944,508 @@ def draw_grid():
     y_center = HEIGHT // 2
     y1 = y_center - block * 5
     y2 = y_center + block
-    draw_blocky_text_on_grid(line1, x1, y1, (60, 60, 120), scale=scale)
-    draw_blocky_text_on_grid(line2, x2, y2, (60, 60, 120), scale=scale)
-
-def draw_blocky_text_on_grid(message, start_x, start_y, color=(80, 80, 180), scale=0.5):
-    font_map = {
-        "A": ["01110","10001","11111","10001","10001"],
-        "E": ["11111","10000","11110","10000","11111"],
-        "G": ["01111","10000","10111","10001","01110"],
-        "H": ["10001","10001","11111","10001","10001"],
-        "I": ["11111","00100","00100","00100","11111"],
-        "J": ["00111","00010","00010","10010","01100"],
-        "K": ["10001","10010","11100","10010","10001"],
-        "M": ["10001","11011","10101","10001","10001"],
-        "N": ["10001","11001","10101","10011","10001"],
-        "S": ["01111","10000","01110","00001","11110"],
-        "D": ["11110","10001","10001","10001","11110"],
-        "B": ["11110","10001","11110","10001","11110"],
-        "Y": ["10001","01010","00100","00100","00100"],
-        " ": ["00000","00000","00000","00000","00000"],
-    }
+    draw_blocky_text_on_grid(line1, x1, y1, (60, 60, 120), scale=scale, surface=surface)
+    draw_blocky_text_on_grid(line2, x2, y2, (60, 60, 120), scale=scale, surface=surface)
+
+BLOCKY_FONT = {
+    "A": ["01110","10001","11111","10001","10001"],
+    "E": ["11111","10000","11110","10000","11111"],
+    "G": ["01111","10000","10111","10001","01110"],
+    "H": ["10001","10001","11111","10001","10001"],
+    "I": ["11111","00100","00100","00100","11111"],
+    "J": ["00111","00010","00010","10010","01100"],
+    "K": ["10001","10010","11100","10010","10001"],
+    "M": ["10001","11011","10101","10001","10001"],
+    "N": ["10001","11001","10101","10011","10001"],
+    "S": ["01111","10000","01110","00001","11110"],
+    "D": ["11110","10001","10001","10001","11110"],
+    "B": ["11110","10001","11110","10001","11110"],
+    "Y": ["10001","01010","00100","00100","00100"],
+    " ": ["00000","00000","00000","00000","00000"],
+}
+# Lit (col, row) pairs per glyph, parsed once instead of on every draw
+BLOCKY_GLYPHS = {
+    char: [(col, row) for row, bits in enumerate(pattern) for col, bit in enumerate(bits) if bit == "1"]
+    for char, pattern in BLOCKY_FONT.items()
+}
+
+def draw_blocky_text_on_grid(message, start_x, start_y, color=(80, 80, 180), scale=0.5, surface=None):
+    surface = surface or screen
     message = message.upper()
     x = start_x
     y = start_y
     block = int(SNAKE_SIZE * scale)
     for char in message:
-        if (char in font_map):
-            pattern = font_map[char]
-            for row_idx, row in enumerate(pattern):
-                for col_idx, bit in enumerate(row):
-                    if bit == "1":
-                        rect = pygame.Rect(
-                            x + col_idx * block,
-                            y + row_idx * block,
-                            block, block
-                        )
-                        pygame.draw.rect(screen, color, rect)
-            x += int(6 * block)
+        for col, row in BLOCKY_GLYPHS.get(char, ()):
+            surface.fill(color, (x + col * block, y + row * block, block, block))
+        x += int(6 * block)
+
+# --- Background Cache ---
+BACKGROUND_CACHE_SIZE = 4
+background_cache = OrderedDict()
+
+def build_background():
+    """The static part of the playfield: theme colour, grid and watermark."""
+    surface = pygame.Surface((WIDTH, HEIGHT)).convert()
+    surface.fill(theme["bg"])
+    draw_grid(surface)
+    return surface
+
+def background_key():
+    return (theme_name, WIDTH, HEIGHT, SNAKE_SIZE)
+
+def get_background():
+    """The baked background for the current theme and size (small LRU cache)."""
+    key = background_key()
+    surface = background_cache.get(key)
+    if surface is None:
+        surface = build_background()
+        background_cache[key] = surface
+        if len(background_cache) > BACKGROUND_CACHE_SIZE:
+            background_cache.popitem(last=False)
+    else:
+        background_cache.move_to_end(key)
+    return surface
+
+# --- Dirty-Rect Renderer ---
+class PlayfieldRenderer:
+    """Redraws only the parts of the playfield that changed since last frame.
+
+    The grid and watermark are baked into a background surface once per
+    theme and size.  Each frame the cells the head entered and the tail left,
+    a moved apple or bomb, changed HUD labels and particles are repaired from
+    that background and handed to pygame.display.update() as dirty rects.
+    Anything else on screen (menus, pause, effects) must call invalidate().
+    """
+
+    def __init__(self):
+        self.background = None
+        self.background_key = None
+        self.invalidate()
+
+    def invalidate(self):
+        self.full = True
+        self.state = None
+        self.tick = None
+        self.head = None
+        self.tail = None
+        self.head_rect = None
+        self.tail_rect = None
+        self.food_rect = None
+        self.bomb_rect = None
+        self.labels = []
+        self.particle_rects = []
+        self.particle_area = None
+        self.pieces = {}  # body cell -> its image from snake_variants
+        self.order = {}  # snake cell -> serial, higher nearer the head
+
+    def ensure_background(self):
+        key = background_key()
+        if key != self.background_key:
+            self.background = get_background()
+            self.background_key = key
+            self.full = True
+
+    # Rects of the things we draw, in screen space
+    @staticmethod
+    def cell_rect(pos):
+        return pygame.Rect(pos[0], pos[1], SNAKE_SIZE, SNAKE_SIZE)
+
+    @staticmethod
+    def food_rect_at(pos):
+        offset = (SNAKE_SIZE - APPLE_SIZE) // 2
+        return pygame.Rect(pos[0] + offset, pos[1] + offset, APPLE_SIZE, APPLE_SIZE)
+
+    @staticmethod
+    def bomb_rect_at(pos):
+        offset = (SNAKE_SIZE + 10 - SNAKE_SIZE) // 2
+        return pygame.Rect(pos[0] - offset, pos[1] - offset, SNAKE_SIZE + 10, SNAKE_SIZE + 10)
+
+    def segments_in(self, rect, state):
+        """Snake cells overlapping ``rect``, found through the occupancy set.
+
+        After wrapping on a board that is not a multiple of the cell size the
+        segments sit on a finer lattice (gcd of cell and board size) and may
+        overlap each other, so every lattice point that could reach into
+        ``rect`` is checked rather than just the grid cell.
+        """
+        board = state.board
+        gx = math.gcd(board.cell, board.width)
+        gy = math.gcd(board.cell, board.height)
+        hx, hy = state.snake[0]
+        left = max(0, rect.left - board.cell + 1)
+        top = max(0, rect.top - board.cell + 1)
+        left += (hx - left) % gx
+        top += (hy - top) % gy
+        occupied = state.occupied
+        return [(x, y)
+                for y in range(top, min(rect.bottom, board.height), gy)
+                for x in range(left, min(rect.right, board.width), gx)
+                if (x, y) in occupied]
+
+    def layout_labels(self, hud):
+        labels = []
+        for i, (text, anchor, pos) in enumerate(hud):
+            old = self.labels[i] if i < len(self.labels) else None
+            if old and old[0] == text and old[1] == anchor and old[2] == pos:
+                labels.append(old)
+                continue
+            surface = text_cache.render_number(font, text, theme["text"])
+            labels.append((text, anchor, pos, surface, surface.get_rect(**{anchor: pos})))
+        return labels
+
+    def paint(self, rect, state, labels, particles, head_pos, tail_pos):
+        """Rebuild one screen region from the background up."""
+        screen.set_clip(rect)
+        screen.blit(self.background, rect, rect)
+        head = state.snake[0]
+        body = snake_variants["body", state.direction]
+        # Wrapped segments can overlap; stack them as paint_all() does, tail-most on top
+        segments = sorted(self.segments_in(rect, state), key=self.order.__getitem__, reverse=True)
+        screen.blits([(self.pieces.get(pos, body), pos) for pos in segments if pos != head],
+                     doreturn=False)
+        if len(state.snake) > 1 and self.cell_rect(tail_pos).colliderect(rect):
+            screen.blit(tail_piece(state), tail_pos)
+        if self.cell_rect(head_pos).colliderect(rect):
+            screen.blit(head_piece(state), head_pos)
+        if state.food is not None and self.food_rect_at(state.food).colliderect(rect):
+            draw_food(state.food)
+        if state.bomb is not None and self.bomb_rect_at(state.bomb).colliderect(rect):
+            draw_bomb(state.bomb)
+        for label in labels:
+            if label[4].colliderect(rect):
+                screen.blit(label[3], label[4])
+        if self.particle_area and self.particle_area.colliderect(rect):
+            particles.draw(screen)
+        screen.set_clip(None)
+
+    def paint_all(self, state, labels, particles, head_pos, tail_pos):
+        screen.blit(self.background, (0, 0))
+        pieces = snake_pieces(state.board, state.snake, state.prev_tail)
+        self.pieces = {pos: image for image, pos in pieces}
+        self.order = {pos: -i for i, pos in enumerate(state.snake)}
+        if len(state.snake) > 1:
+            # The tail is drawn where it is sliding to, over its cell
+            pieces.append((tail_piece(state), tail_pos))
+        pieces.append((head_piece(state), head_pos))
+        screen.blits(pieces, doreturn=False)
+        if state.food is not None:
+            draw_food(state.food)
+        if state.bomb is not None:
+            draw_bomb(state.bomb)
+        for label in labels:
+            screen.blit(label[3], label[4])
+        if particles:
+            particles.draw(screen)
+
+    @staticmethod
+    def slide(board, start, end, alpha):
+        """The point ``alpha`` of the way from ``start`` to ``end``, across the wrap if shorter."""
+        dx = (end[0] - start[0] + board.width // 2) % board.width - board.width // 2
+        dy = (end[1] - start[1] + board.height // 2) % board.height - board.height // 2
+        return (round(start[0] + dx * alpha), round(start[1] + dy * alpha))
+
+    def moving_parts(self, state, alpha):
+        """Where the head and the trailing tail segment are drawn between ticks.
+
+        Sliding every segment by ``alpha`` covers the same pixels as keeping
+        the body on its cells and only sliding the head out of the neck and
+        an extra tail segment out of the cell it is leaving, so interpolated
+        frames still only touch a few cells.
+        """
+        head, tail = state.snake[0], state.snake[-1]
+        if alpha >= 1 or state.prev_head is None:
+            return head, tail
+        board = state.board
+        return (self.slide(board, state.prev_head, head, alpha),
+                self.slide(board, state.prev_tail, tail, alpha))
+
+    def draw(self, state, hud, particles=None, alpha=1.0):
+        """Bring the screen up to date with ``state`` and push the changes.
+
+        ``hud`` is a list of (text, anchor, pos) labels, e.g.
+        ("Score: 10", "topleft", (10, 10)).  ``alpha`` is how far the game is
+        towards its next tick; the head and tail are drawn that far along.
+        """
+        self.ensure_background()
+        labels = self.layout_labels(hud)
+        head, tail = state.snake[0], state.snake[-1]
+        head_pos, tail_pos = self.moving_parts(state, alpha)
+        head_rect, tail_rect = self.cell_rect(head_pos), self.cell_rect(tail_pos)
+        food_rect = self.food_rect_at(state.food) if state.food is not None else None
+        bomb_rect = self.bomb_rect_at(state.bomb) if state.bomb is not None else None
+        self.particle_area = particles.bounds() if particles else None
+        particle_rects = [self.particle_area] if self.particle_area else []
+
+        if self.full or state is not self.state or state.tick - self.tick not in (0, 1):
+            # Something else drew over the playfield, or we skipped ticks
+            self.paint_all(state, labels, particles, head_pos, tail_pos)
+            pygame.display.flip()
+            self.full = False
         else:
-            x += int(6 * block)
+            dirty = []
+            if head != self.head:
+                if tail != self.tail:
+                    self.order.pop(self.tail)  # first: the head may have moved into it
+                self.order[head] = state.tick
+                # The new head cell, the old head (now body) and the cell the tail left
+                dirty.append(self.cell_rect(head))
+                dirty.append(self.cell_rect(self.head))
+                # Only the old head and the tail get new neighbours; every
+                # other segment keeps its piece
+                snake = state.snake
+                if len(snake) > 1:
+                    behind = snake[2] if len(snake) > 2 else state.prev_tail
+                    self.pieces[snake[1]] = snake_piece(state.board, head, snake[1], behind)
+                    self.pieces[tail] = snake_piece(state.board, snake[-2], tail, state.prev_tail)
+                    dirty.extend((self.cell_rect(tail), tail_rect))
+            if tail != self.tail:
+                dirty.append(self.cell_rect(self.tail))
+                self.pieces.pop(self.tail, None)
+            if head_rect != self.head_rect:
+                dirty.extend((self.head_rect, head_rect))
+            if tail_rect != self.tail_rect:
+                dirty.extend((self.tail_rect, tail_rect))
+            if food_rect != self.food_rect:
+                dirty.extend(r for r in (self.food_rect, food_rect) if r)
+            if bomb_rect != self.bomb_rect:
+                dirty.extend(r for r in (self.bomb_rect, bomb_rect) if r)
+            for i in range(max(len(labels), len(self.labels))):
+                old = self.labels[i] if i < len(self.labels) else None
+                new = labels[i] if i < len(labels) else None
+                if old is not new:
+                    dirty.extend(label[4] for label in (old, new) if label)
+            dirty.extend(self.particle_rects)
+            dirty.extend(particle_rects)
+            screen_rect = screen.get_rect()
+            dirty = [r.clip(screen_rect) for r in dirty]
+            dirty = [r for r in dirty if r.width and r.height]
+            for rect in dirty:
+                self.paint(rect, state, labels, particles, head_pos, tail_pos)
+            if dirty:
+                pygame.display.update(dirty)
+
+        self.state, self.tick = state, state.tick
+        self.head, self.tail = head, tail
+        self.head_rect, self.tail_rect = head_rect, tail_rect
+        self.food_rect, self.bomb_rect = food_rect, bomb_rect
+        self.labels = labels
+        self.particle_rects = particle_rects
+
+playfield = PlayfieldRenderer()
+
+# --- Giant Board ---
+# A board far bigger than the window, seen through a camera centred on the
+# head.  Both sides must be a multiple of CHUNK_CELLS and much bigger than
+# any window in SCREEN_SIZES.
+GIANT_BOARD_CELLS = (1024, 1024)
+CHUNK_CELLS = 8  # chunk side in cells; 256 px at SNAKE_SIZE 32
+CHUNK_CACHE_SIZE = 64  # baked chunks kept; a 1000x800 window shows at most 25
+
+def giant_board():
+    return engine.Board(GIANT_BOARD_CELLS[0] * SNAKE_SIZE, GIANT_BOARD_CELLS[1] * SNAKE_SIZE,
+                        SNAKE_SIZE, APPLE_SIZE, SNAKE_SIZE + 10)
+
+class WorldRenderer(PlayfieldRenderer):
+    """Draws a board of any size through a window-sized camera.
+
+    The world is cut into chunks of CHUNK_CELLS x CHUNK_CELLS cells, each
+    baked on first sight into a surface holding the grid and the snake body
+    and kept in a small LRU.  A tick repaints only the cells whose piece
+    changed, in whichever chunks are cached, and a frame blits the chunks
+    the camera overlaps, then the head, tail, apple, bomb and HUD if they
+    are in view.  The cost of a frame follows the window size, never the
+    size of the board or the length of the snake.  Interpolation and HUD
+    labels work as in PlayfieldRenderer.
+    """
+
+    def __init__(self):
+        self.chunks = OrderedDict()
+        self.key = None
+        self.tile = None
+        super().__init__()
+
+    def invalidate(self):
+        self.chunks.clear()
+        self.state = None
+        self.tick = None
+        self.head = None
+        self.tail = None
+        self.pieces = {}  # body cell -> its image from snake_variants
+        self.labels = []
+
+    def ensure_key(self, board):
+        key = (theme_name, board.width, board.height, board.cell)
+        if key != self.key:
+            self.key = key
+            self.invalidate()
+            # One cell of background: the grid line along its top and left
+            self.tile = pygame.Surface((board.cell, board.cell)).convert()
+            self.tile.fill(theme["bg"])
+            pygame.draw.line(self.tile, GRID_COLOR, (0, 0), (board.cell, 0))
+            pygame.draw.line(self.tile, GRID_COLOR, (0, 0), (0, board.cell))
+
+    # --- Chunks ---
+    def chunk(self, board, cx, cy):
+        """The baked chunk (cx, cy), from the cache or drawn now."""
+        surface = self.chunks.get((cx, cy))
+        if surface is not None:
+            self.chunks.move_to_end((cx, cy))
+            return surface
+        cell = board.cell
+        size = CHUNK_CELLS * cell
+        surface = pygame.Surface((size, size)).convert()
+        surface.fill(theme["bg"])
+        for i in range(0, size, cell):
+            pygame.draw.line(surface, GRID_COLOR, (i, 0), (i, size))
+            pygame.draw.line(surface, GRID_COLOR, (0, i), (size, i))
+        left, top = cx * size, cy * size
+        pieces = self.pieces
+        surface.blits([(pieces[x, y], (x - left, y - top))
+                       for y in range(top, top + size, cell)
+                       for x in range(left, left + size, cell)
+                       if (x, y) in pieces], doreturn=False)
+        self.chunks[cx, cy] = surface
+        if len(self.chunks) > CHUNK_CACHE_SIZE:
+            self.chunks.popitem(last=False)
+        return surface
 
-# --- Game Logic ---
-def reset_game():
-    snake = [(WIDTH // 2, HEIGHT // 2)]
-    direction = (0, -SNAKE_SIZE)
-    food_position = get_new_food_position(snake)
-    score = 0
-    return snake, direction, food_position, score
-
-def score_pixel_animation(score, pos, particles):
-    color = (255, 215, 0) if score % 100 == 0 else (0, 255, 255)
-    for _ in range(40):
-        angle = random.uniform(0, 2 * math.pi)
-        speed = random.uniform(3, 7)
-        vx = math.cos(angle) * speed
-        vy = math.sin(angle) * speed
-        particles.append({
-            "x": pos[0], "y": pos[1],
-            "vx": vx, "vy": vy,
-            "life": random.randint(12, 20),
-            "color": color
-        })
-    for _ in range(18):
-        screen.fill(theme["bg"])
-        score_label = font.render(f"Score: {score}", True, theme["text"])
-        screen.blit(score_label, pos)
-        for p in particles:
-            if p["life"] > 0:
-                pygame.draw.rect(screen, p["color"], (int(p["x"]), int(p["y"]), 5, 5))
-                p["x"] += p["vx"]
-                p["y"] += p["vy"]
-                p["life"] -= 1
+    def repaint_cell(self, board, pos):
+        """Bring ``pos`` up to date in its chunk, if that chunk is baked."""
+        size = CHUNK_CELLS * board.cell
+        surface = self.chunks.get((pos[0] // size, pos[1] // size))
+        if surface is None:
+            return
+        local = (pos[0] % size, pos[1] % size)
+        surface.blit(self.tile, local)
+        piece = self.pieces.get(pos)
+        if piece is not None:
+            surface.blit(piece, local)
+
+    def update_pieces(self, state):
+        """Follow the snake from the last frame: a few cells per tick, or all of them after a jump."""
+        board = state.board
+        snake = state.snake
+        head, tail = snake[0], snake[-1]
+        if state is not self.state or state.tick - self.tick not in (0, 1):
+            self.pieces = {pos: image for image, pos in snake_pieces(board, snake, state.prev_tail)}
+            self.chunks.clear()
+        elif head != self.head:
+            # As in PlayfieldRenderer.draw(): only the old head and the tail
+            # get new neighbours, and the cell the tail left empties
+            changed = []
+            if len(snake) > 1:
+                behind = snake[2] if len(snake) > 2 else state.prev_tail
+                self.pieces[snake[1]] = snake_piece(board, head, snake[1], behind)
+                self.pieces[tail] = snake_piece(board, snake[-2], tail, state.prev_tail)
+                changed += (snake[1], tail)
+            if tail != self.tail:
+                self.pieces.pop(self.tail, None)
+                changed.append(self.tail)
+            for pos in changed:
+                self.repaint_cell(board, pos)
+        self.state, self.tick = state, state.tick
+        self.head, self.tail = head, tail
+
+    # --- Camera ---
+    @staticmethod
+    def to_screen(board, pos, left, top, margin=SNAKE_SIZE + 10):
+        """Where world ``pos`` lands in a window whose top-left is world (left, top).
+
+        Points up to ``margin`` left of or above the window come out
+        negative instead of wrapping to the far side of the board.
+        """
+        return ((pos[0] - left + margin) % board.width - margin,
+                (pos[1] - top + margin) % board.height - margin)
+
+    @staticmethod
+    def in_view(screen_pos):
+        return screen_pos[0] < WIDTH and screen_pos[1] < HEIGHT
+
+    def food_marker(self, board, food, left, top):
+        """Where to draw the apple; pinned to the window edge, in its direction, while out of view."""
+        offset = (SNAKE_SIZE - APPLE_SIZE) // 2
+        # The shortest way round the board from the middle of the window
+        dx = (food[0] + offset - left - WIDTH // 2 + board.width // 2) % board.width - board.width // 2
+        dy = (food[1] + offset - top - HEIGHT // 2 + board.height // 2) % board.height - board.height // 2
+        reach_x = WIDTH // 2 - APPLE_SIZE - 10
+        reach_y = HEIGHT // 2 - APPLE_SIZE - 10
+        scale = min(1.0, reach_x / abs(dx) if dx else 1.0, reach_y / abs(dy) if dy else 1.0)
+        return (WIDTH // 2 + round(dx * scale), HEIGHT // 2 + round(dy * scale))
+
+    def draw(self, state, hud, alpha=1.0):
+        """Draw the view around the head and flip; ``hud`` and ``alpha`` as for PlayfieldRenderer."""
+        board = state.board
+        self.ensure_key(board)
+        self.update_pieces(state)
+        head_pos, tail_pos = self.moving_parts(state, alpha)
+        left = head_pos[0] + board.cell // 2 - WIDTH // 2
+        top = head_pos[1] + board.cell // 2 - HEIGHT // 2
+
+        size = CHUNK_CELLS * board.cell
+        cols, rows = board.width // size, board.height // size
+        blits = [(self.chunk(board, cx % cols, cy % rows), (cx * size - left, cy * size - top))
+                 for cy in range(top // size, (top + HEIGHT - 1) // size + 1)
+                 for cx in range(left // size, (left + WIDTH - 1) // size + 1)]
+        if len(state.snake) > 1:
+            tail = self.to_screen(board, tail_pos, left, top)
+            if self.in_view(tail):
+                blits.append((tail_piece(state), tail))
+        blits.append((head_piece(state), (head_pos[0] - left, head_pos[1] - top)))
+        if state.food is not None:
+            blits.append((apple_img, self.food_marker(board, state.food, left, top)))
+        if state.bomb is not None:
+            offset = (board.bomb_size - board.cell) // 2
+            bomb = self.to_screen(board, (state.bomb[0] - offset, state.bomb[1] - offset), left, top)
+            if self.in_view(bomb):
+                blits.append((bomb_img, bomb))
+        screen.blits(blits, doreturn=False)
+
+        self.labels = self.layout_labels(hud)
+        for label in self.labels:
+            screen.blit(label[3], label[4])
         pygame.display.flip()
-        pygame.time.delay(18)
 
-def load_high_score():
+world = WorldRenderer()
+
+# --- Game Logic ---
+def reset_game(bombs=False):
+    # Each game gets its own seeded RNG so it can be recorded and replayed
+    return engine.new_game(current_board(), direction=engine.UP, bombs=bombs, seed=random.getrandbits(64))
+
+def save_replay(recorder, folder=REPLAY_DIR, mode=None, limit=replay.MAX_REPLAYS):
+    """Write the finished game (see Recorder.save); failing to must not end the game."""
     try:
-        with open("high_score.txt", "r") as f:
-            return int(f.read())
-    except Exception:
-        return 0
+        return recorder.save(folder, mode=mode, limit=limit)
+    except OSError as e:
+        print(f"Error saving replay: {e}")
+        return None
 
-def save_high_score(high_score):
-    with open("high_score.txt", "w") as f:
-        f.write(str(high_score))
+def score_pixel_animation(score, pos):
+    color = (255, 215, 0) if score % 100 == 0 else (0, 255, 255)
+    particles.emit(pos[0], pos[1], color, 40, speed=(3, 7), life=(12, 20), size=5, shape=SQUARE)
+    return pygame.time.get_ticks() + SCORE_EFFECT_MS
 
 def countdown():
     for i in range(3, 0, -1):
         screen.fill(theme["bg"])
-        label = font.render(f"Starting in {i}", True, theme["text"])
+        label = render_text(f"Starting in {i}", theme["text"])
         screen.blit(label, (WIDTH//2 - label.get_width()//2, HEIGHT//2 - label.get_height()//2))
         pygame.display.flip()
         pygame.time.delay(800)
 
 # --- Background Music Playlist Setup ---
-MUSIC_DIR = r"C:\Users\notye\OneDrive\Documents\Python Projects by me\snake-game\src\assets\sounds\Music"
-music_files = []
+MUSIC_DIR = assets.MUSIC_DIR
+music_files = None  # listed on first use, not at import
 current_music_index = 0
 
 def load_music_playlist():
     global music_files
-    music_files = glob.glob(os.path.join(MUSIC_DIR, "*.mp3"))
-    music_files.sort()
+    music_files = assets.music_files(MUSIC_DIR)
 
 def is_music_available():
+    if music_files is None:
+        load_music_playlist()
     return bool(music_files)
 
 def play_music(index=0):
@@ -877,7 +1454,7 @@ def play_music(index=0):
     try:
         pygame.mixer.music.load(music_files[index])
         pygame.mixer.music.play()
-        pygame.mixer.music.set_endevent(pygame.USEREVENT + 1)
+        pygame.mixer.music.set_endevent(MUSIC_END_EVENT)
     except Exception as e:
         print(f"Error playing music: {e}")
 
@@ -898,41 +1475,27 @@ def start_music():
 def stop_music():
     pygame.mixer.music.stop()
 
-pygame.mixer.init()
-load_music_playlist()
 
 # --- Main Loop ---
 def main():
-    def wrap_position(pos):
-        return (pos[0] % WIDTH, pos[1] % HEIGHT)
-
-    def get_new_bomb_position(snake, food_position):
-        min_x = 0
-        max_x = WIDTH - SNAKE_SIZE
-        min_y = 0
-        max_y = HEIGHT - SNAKE_SIZE
-        while True:
-            pos = (
-                random.randrange(min_x, max_x + 1, SNAKE_SIZE),
-                random.randrange(min_y, max_y + 1, SNAKE_SIZE)
-            )
-            if pos not in snake and pos != food_position:
-                return pos
-
+    bootstrap()
     startup_screen()
-    snake, direction, food_position, score = reset_game()
+    state = reset_game()
+    recorder = replay.Recorder(state, FPS)
     running = False
-    high_score = load_high_score()
+    high_score = profile.high_score("classic")
     last_milestone = 0
-    particles = []
+    milestone_until = effect_until = 0
+    show_jitter = False
 
     while True:
         choice = home_screen()
         if choice == "Play New Game":
-            snake, direction, food_position, score = reset_game()
+            state = reset_game()
+            recorder = replay.Recorder(state, FPS)
             running = True
             last_milestone = 0
-            particles = []
+            particles.clear()
             start_music()
         elif choice == "Resume" and running:
             pass
@@ -957,84 +1520,87 @@ def main():
             continue
 
         start_ticks = pygame.time.get_ticks()
+        playfield.invalidate()
+        timestep = FixedTimestep(FPS)
+        turns = engine.TurnQueue(TURN_QUEUE_SIZE)
 
         while running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit(); exit()
-                elif event.type == pygame.USEREVENT + 1:
+                elif event.type == MUSIC_END_EVENT:
                     play_next_music()
                 elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_UP and direction != (0, SNAKE_SIZE):
-                        direction = (0, -SNAKE_SIZE)
-                    elif event.key == pygame.K_DOWN and direction != (0, -SNAKE_SIZE):
-                        direction = (0, SNAKE_SIZE)
-                    elif event.key == pygame.K_LEFT and direction != (SNAKE_SIZE, 0):
-                        direction = (-SNAKE_SIZE, 0)
-                    elif event.key == pygame.K_RIGHT and direction != (-SNAKE_SIZE, 0):
-                        direction = (SNAKE_SIZE, 0)
+                    if event.key in KEY_DIRECTIONS:
+                        turns.push(KEY_DIRECTIONS[event.key])
+                    elif event.key == pygame.K_F3:
+                        show_jitter = not show_jitter
+                    elif not state.alive:
+                        continue  # the crash effect plays out so the game is always recorded
                     elif event.key == pygame.K_ESCAPE:
                         running = False
                     elif event.key == pygame.K_p:
                         result = pause_screen()
+                        playfield.invalidate()
+                        timestep.reset(pygame.time.get_ticks())
                         if result == "Return to Menu":
                             running = False
                             break
-
-            new_head = wrap_position((snake[0][0] + direction[0], snake[0][1] + direction[1]))
-
-            if new_head in snake:
-                play_sound('gameover')
-                particle_crash_effect(snake)
-                time.sleep(0.5)
-                if score > high_score:
-                    high_score = score
-                    save_high_score(high_score)
-                result = end_game_screen(score, high_score)
+            if not running:
+                break
+
+            now = pygame.time.get_ticks()
+            if state.alive:
+                for _ in range(timestep.advance(now)):
+                    engine.step(state, turns.pop(state.direction))
+                    recorder.record(state)
+                    if not state.alive:
+                        break
+                    if state.ate:
+                        play_sound('eat')
+                if not state.alive:
+                    save_replay(recorder)
+                    effect_until = now
+                    if not state.won:
+                        play_sound('gameover')
+                        effect_until = particle_crash_effect(state.snake)
+            elif now >= effect_until:
+                particles.clear()
+                if profile.record_game("classic", state.score, state.score // engine.APPLE_POINTS,
+                                       len(state.snake), state.tick / FPS):
+                    high_score = state.score
+                result = end_game_screen(state.score, high_score, won=state.won)
                 if result == "Play Again":
-                    snake, direction, food_position, score = reset_game()
+                    state = reset_game()
+                    recorder = replay.Recorder(state, FPS)
                     start_ticks = pygame.time.get_ticks()
                     last_milestone = 0
+                    timestep.reset(start_ticks)
+                    turns.clear()
+                    playfield.invalidate()
                     continue
                 elif result == "Return to Menu":
                     running = False
                     break
+            particles.update()
 
-            snake.insert(0, new_head)
-
-            if is_on_apple(snake[0], food_position):
-                score += 10
-                food_position = get_new_food_position(snake)
-                play_sound('eat')
-            else:
-                snake.pop()
-
-            screen.fill(theme["bg"])
-            draw_grid()
-            draw_snake(snake)
-            draw_food(food_position)
-            score_label = font.render(f"Score: {score}", True, theme["text"])
+            score = state.score
             score_pos = (10, 10)
-            screen.blit(score_label, score_pos)
-            length_label = font.render(f"Length: {len(snake)}", True, theme["text"])
-            screen.blit(length_label, (10, 40))
-            draw_timer(start_ticks)
-
             if score > 0 and score % 100 == 0 and score != last_milestone:
-                score_pixel_animation(score, (score_pos[0] + 100, score_pos[1] + 20), particles)
+                milestone_until = score_pixel_animation(score, (score_pos[0] + 100, score_pos[1] + 20))
                 last_milestone = score
 
-            for p in particles[:]:
-                if p["life"] > 0:
-                    pygame.draw.rect(screen, p["color"], (int(p["x"]), int(p["y"]), 5, 5))
-                    p["x"] += p["vx"]
-                    p["y"] += p["vy"]
-                    p["life"] -= 1
-                else:
-                    particles.remove(p)
-
-            pygame.display.flip()
-            clock.tick(FPS)
+            hud = [
+                (f"Score: {score}", "topleft", score_pos),
+                (f"Length: {len(state.snake)}", "topleft", (10, 40)),
+                (format_timer(start_ticks), "topright", (WIDTH - 20, 10)),
+            ]
+            if now < milestone_until:
+                hud.append((f"Score: {last_milestone}", "topleft", (score_pos[0] + 100, score_pos[1] + 20)))
+            if show_jitter:
+                hud.append(jitter_label(timestep))
+            playfield.draw(state, hud, particles, timestep.alpha)
+            clock.tick(RENDER_FPS)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,138 @@
+import numpy as np
+import pygame
+
+CIRCLE = "circle"
+SQUARE = "square"
+
+FIELDS = ("x", "y", "vx", "vy", "life", "style")
+
+
+class ParticlePool:
+    """A fixed-capacity pool of particles kept as parallel NumPy arrays.
+
+    Live particles are packed into the first ``count`` slots.  update()
+    integrates all of them with a few vector operations and fills the holes
+    left by dead particles with live ones from the end (swap-remove), so no
+    per-particle objects are created or destroyed.  Each (color, size,
+    shape) combination is a style; its sprite is drawn once per alpha level
+    and reused from a cache.  Emitting past ``capacity`` drops the excess.
+    """
+
+    def __init__(self, capacity=20000, seed=None):
+        self.capacity = capacity
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.life = np.zeros(capacity, dtype=np.int32)
+        self.style = np.zeros(capacity, dtype=np.int32)
+        self.styles = []
+        self.style_ids = {}
+        self.sprites = {}
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    # --- Styles and sprites ---
+    def style_id(self, color, size, shape):
+        key = (tuple(color), size, shape)
+        sid = self.style_ids.get(key)
+        if sid is None:
+            sid = self.style_ids[key] = len(self.styles)
+            self.styles.append(key)
+        return sid
+
+    def sprite(self, sid, alpha):
+        key = (sid, alpha)
+        surface = self.sprites.get(key)
+        if surface is None:
+            color, size, shape = self.styles[sid]
+            if shape == CIRCLE:
+                surface = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+                pygame.draw.circle(surface, (*color[:3], alpha), (size, size), size)
+            else:
+                surface = pygame.Surface((size, size), pygame.SRCALPHA)
+                surface.fill((*color[:3], alpha))
+            self.sprites[key] = surface
+        return surface
+
+    # --- Simulation ---
+    def emit(self, x, y, color, count, speed=(2, 6), life=(10, 20), size=4, shape=CIRCLE):
+        """Burst ``count`` particles out of (x, y) in random directions.
+
+        ``speed`` is a (min, max) range in pixels per update and ``life`` a
+        (min, max) range of updates, both inclusive.  Circles are centred on
+        their position, squares hang from their top-left corner.  Colors with
+        an alpha component fade out over the particle's last frames.
+        """
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return 0
+        start, end = self.count, self.count + count
+        angle = self.rng.uniform(0, 2 * np.pi, count)
+        speed = self.rng.uniform(speed[0], speed[1], count)
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.vx[start:end] = np.cos(angle) * speed
+        self.vy[start:end] = np.sin(angle) * speed
+        self.life[start:end] = self.rng.integers(life[0], life[1], count, endpoint=True)
+        self.style[start:end] = self.style_id(color, size, shape)
+        self.count = end
+        return count
+
+    def update(self):
+        n = self.count
+        if not n:
+            return
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.life[:n] -= 1
+        alive = self.life[:n] > 0
+        keep = int(np.count_nonzero(alive))
+        if keep < n:
+            holes = np.flatnonzero(~alive[:keep])
+            movers = keep + np.flatnonzero(alive[keep:])
+            for name in FIELDS:
+                values = getattr(self, name)
+                values[holes] = values[movers]
+            self.count = keep
+
+    def clear(self):
+        self.count = 0
+
+    # --- Drawing ---
+    def positions(self):
+        """Top-left corners of the live particles' sprites, as int arrays."""
+        n = self.count
+        offset = np.array([-size if shape == CIRCLE else 0 for _, size, shape in self.styles] or [0])
+        shift = offset[self.style[:n]]
+        return (self.x[:n] + shift).astype(np.int32), (self.y[:n] + shift).astype(np.int32)
+
+    def bounds(self):
+        """One rect around every live particle, or None."""
+        if not self.count:
+            return None
+        xs, ys = self.positions()
+        extent = max(size * 2 if shape == CIRCLE else size for _, size, shape in self.styles)
+        left, top = int(xs.min()), int(ys.min())
+        return pygame.Rect(left, top, int(xs.max()) - left + extent, int(ys.max()) - top + extent)
+
+    def draw(self, surface):
+        n = self.count
+        if not n:
+            return
+        xs, ys = self.positions()
+        styles = self.style[:n]
+        fading = np.array([len(color) > 3 for color, _, _ in self.styles])[styles]
+        alpha = np.where(fading, np.minimum(255, self.life[:n] * 10), 255)
+        # Only a handful of (style, alpha) pairs are live at once: look each
+        # one up once and fan the sprites out with a fancy index
+        keys, inverse = np.unique(styles * 256 + alpha, return_inverse=True)
+        lookup = np.empty(len(keys), dtype=object)
+        lookup[:] = [self.sprite(key >> 8, key & 255) for key in keys.tolist()]
+        surface.blits(zip(lookup[inverse].tolist(), zip(xs.tolist(), ys.tolist())), doreturn=False)
@@ -0,0 +1,167 @@
+"""The player's profile: high scores per mode, settings and play statistics.
+
+Everything lives in one JSON file.  Changes are made to the in-memory
+profile and a background thread writes it out a moment later, batching
+whatever else changed meanwhile, so the game loop never waits on the disk.
+Each write goes to a temporary file that is then renamed over the profile,
+so a crash mid-write leaves the previous profile intact.
+"""
+import atexit
+import copy
+import json
+import os
+import threading
+import time
+
+PROFILE_FILE = "profile.json"
+FLUSH_DELAY_S = 0.5  # changes made within this long share one write
+VERSION = 1
+
+# Older builds kept a single high score per front-end in these files
+LEGACY_HIGH_SCORES = {
+    "classic": "high_score.txt",  # main.py
+    "enhanced": "highscore.dat",  # game.py
+}
+
+
+def default_profile():
+    return {
+        "version": VERSION,
+        "high_scores": {},
+        "settings": {},
+        "stats": {"games_played": 0, "apples_eaten": 0, "seconds_played": 0, "longest_snake": 0},
+    }
+
+
+class ProfileStore:
+    """One player's profile at ``path`` with write-behind saving.
+
+    load() reads the file (or, the first time, the old high-score files)
+    and is meant for start-up.  After that a change only updates memory
+    and wakes the writer thread; flush() waits for the pending write and
+    runs by itself at interpreter exit.
+    """
+
+    def __init__(self, path=PROFILE_FILE, delay=FLUSH_DELAY_S):
+        self.path = path
+        self.delay = delay
+        self.data = default_profile()
+        # Every change bumps ``version``; the writer records what it saved
+        self.changed = threading.Condition()
+        self.version = 0
+        self.written = 0
+        self.writer = None
+
+    # --- Loading ---
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            self.import_legacy()
+            return self
+        except (OSError, ValueError) as e:
+            print(f"Error reading profile '{self.path}', starting a new one: {e}")
+            if isinstance(e, ValueError):
+                try:
+                    os.replace(self.path, self.path + ".bad")  # keep it for a look, out of the way
+                except OSError:
+                    pass
+            return self
+        if isinstance(data, dict):
+            for section, values in default_profile().items():
+                if isinstance(values, dict) and isinstance(data.get(section), dict):
+                    values.update(data[section])
+                self.data[section] = values
+        return self
+
+    def import_legacy(self):
+        folder = os.path.dirname(self.path)
+        for mode, name in LEGACY_HIGH_SCORES.items():
+            try:
+                with open(os.path.join(folder, name), "rb") as f:
+                    score = int(f.read().strip() or 0)
+            except (OSError, ValueError):
+                continue
+            self.data["high_scores"][mode] = score
+            self.save()
+
+    # --- Reading ---
+    def high_score(self, mode):
+        return self.data["high_scores"].get(mode, 0)
+
+    def setting(self, name, default=None):
+        return self.data["settings"].get(name, default)
+
+    def stat(self, name):
+        return self.data["stats"].get(name, 0)
+
+    # --- Changing ---
+    def update_settings(self, **settings):
+        with self.changed:
+            if all(self.data["settings"].get(k) == v for k, v in settings.items()):
+                return
+            self.data["settings"].update(settings)
+        self.save()
+
+    def record_game(self, mode, score, apples=0, length=0, seconds=0):
+        """Count a finished game; True if ``score`` is a new high score for ``mode``."""
+        with self.changed:
+            stats = self.data["stats"]
+            stats["games_played"] += 1
+            stats["apples_eaten"] += apples
+            stats["seconds_played"] += int(seconds)
+            stats["longest_snake"] = max(stats["longest_snake"], length)
+            new_record = score > self.data["high_scores"].get(mode, 0)
+            if new_record:
+                self.data["high_scores"][mode] = score
+        self.save()
+        return new_record
+
+    def add_stat(self, name, amount=1):
+        with self.changed:
+            self.data["stats"][name] = self.data["stats"].get(name, 0) + amount
+        self.save()
+
+    # --- Writing ---
+    def save(self):
+        """Schedule a write of the whole profile; returns at once."""
+        with self.changed:
+            self.version += 1
+            self.changed.notify_all()
+            if self.writer is None:
+                self.writer = threading.Thread(target=self.run, name="profile", daemon=True)
+                self.writer.start()
+                atexit.register(self.flush)
+
+    def run(self):
+        while True:
+            with self.changed:
+                self.changed.wait_for(lambda: self.version > self.written)
+            time.sleep(self.delay)  # let more changes pile up into this write
+            self.write()
+
+    def write(self):
+        with self.changed:
+            data = copy.deepcopy(self.data)
+            version = self.version
+        tmp = self.path + ".tmp"
+        try:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Error saving profile: {e}")
+        with self.changed:
+            self.written = version  # even on failure, so flush() cannot hang
+            self.changed.notify_all()
+
+    def flush(self, timeout=None):
+        """Wait until every change so far is on disk."""
+        with self.changed:
+            return self.changed.wait_for(lambda: self.written >= self.version, timeout)
@@ -0,0 +1,204 @@
+"""Record games as a seed plus their turns, and play them back headless.
+
+A replay is everything engine.new_game() needs (board geometry, seed,
+survival bombs, starting direction) followed by the ticks on which the
+snake changed direction.  Since all randomness comes from the per-game RNG
+seeded from the header, stepping the engine with those turns reproduces
+the game exactly, including its final score.
+
+File layout, after the 4-byte magic and a version byte, is a run of
+unsigned LEB128 varints: width, height, cell, apple size, bomb size,
+flags, seed, starting direction, tick rate, final tick, score, number of
+turns, then one varint per turn holding ``ticks since the last turn << 2 |
+direction``.  Most turns fit in a single byte.
+
+Usage:  python replay.py replays/123.snkr --speed 4
+        python replay.py replays/123.snkr --verify
+"""
+import argparse
+import os
+import time
+
+import engine
+
+MAGIC = b"SNKR"
+VERSION = 1
+DIRECTIONS = (engine.UP, engine.DOWN, engine.LEFT, engine.RIGHT)
+DIRECTION_CODES = {d: i for i, d in enumerate(DIRECTIONS)}
+FLAG_BOMBS = 1
+MAX_REPLAYS = 50
+PRUNE_GRACE_S = 3600  # prune() spares files this new
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Recorder:
+    """Collects the turns of one game; call record() after every engine.step()."""
+
+    def __init__(self, state, tick_rate):
+        if state.seed is None:
+            raise ValueError("only games started from a seed can be replayed")
+        self.state = state
+        self.tick_rate = tick_rate
+        self.start_direction = state.direction
+        self.direction = state.direction
+        self.turns = []
+
+    def record(self, state):
+        if state.direction != self.direction:
+            self.direction = state.direction
+            self.turns.append((state.tick, DIRECTION_CODES[state.direction]))
+
+    def to_bytes(self):
+        state, board = self.state, self.state.board
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        for value in (board.width, board.height, board.cell, board.apple_size, board.bomb_size,
+                      FLAG_BOMBS if state.bombs else 0, state.seed,
+                      DIRECTION_CODES[self.start_direction], self.tick_rate,
+                      state.tick, state.score, len(self.turns)):
+            write_varint(out, value)
+        last = 0
+        for tick, code in self.turns:
+            write_varint(out, (tick - last) << 2 | code)
+            last = tick
+        return bytes(out)
+
+    def save(self, folder="replays", name=None, mode=None, limit=MAX_REPLAYS):
+        """Write the replay into ``folder`` as ``<time>-<mode>.snkr``.
+
+        Only the newest ``limit`` replays of the same mode are kept there.
+        With ``limit`` None nothing is deleted here, for folders whose
+        replays something else (e.g. a leaderboard row) points at; those
+        are cleaned up with prune() instead.
+        """
+        mode = mode or ("survival" if self.state.bombs else "classic")
+        os.makedirs(folder, exist_ok=True)
+        name = name or f"{int(time.time() * 1000)}-{mode}.snkr"
+        path = os.path.join(folder, name)
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+        if limit is not None:
+            suffix = f"-{mode}.snkr"
+            replays = sorted((entry for entry in os.scandir(folder) if entry.name.endswith(suffix)),
+                             key=lambda entry: entry.stat().st_mtime)
+            for entry in replays[:max(0, len(replays) - limit)]:
+                os.remove(entry.path)
+        return path
+
+
+def prune(folder, keep, grace=PRUNE_GRACE_S):
+    """Delete the replays in ``folder`` not named in ``keep``.
+
+    Files younger than ``grace`` seconds are left alone, since another
+    game may have just saved one it is about to link.
+    """
+    keep = {os.path.normpath(path) for path in keep}
+    cutoff = time.time() - grace
+    try:
+        entries = list(os.scandir(folder))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if (entry.name.endswith(".snkr") and os.path.normpath(entry.path) not in keep
+                and entry.stat().st_mtime < cutoff):
+            os.remove(entry.path)
+
+
+class Replay:
+    """A decoded replay, ready to be stepped through the engine again."""
+
+    def __init__(self, data):
+        if data[:4] != MAGIC or data[4] != VERSION:
+            raise ValueError("not a snake replay")
+        pos = 5
+        values = []
+        for _ in range(12):
+            value, pos = read_varint(data, pos)
+            values.append(value)
+        (width, height, cell, apple_size, bomb_size, flags, self.seed,
+         direction, self.tick_rate, self.final_tick, self.score, n_turns) = values
+        self.board = engine.Board(width, height, cell, apple_size, bomb_size)
+        self.bombs = bool(flags & FLAG_BOMBS)
+        self.direction = DIRECTIONS[direction]
+        self.turns = {}
+        tick = 0
+        for _ in range(n_turns):
+            value, pos = read_varint(data, pos)
+            tick += value >> 2
+            self.turns[tick] = DIRECTIONS[value & 3]
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def play(self, speed=None, on_tick=None):
+        """Re-run the game and return its final state.
+
+        With ``speed`` None the ticks run back to back; otherwise they are
+        paced at ``speed`` times the recorded tick rate.  ``on_tick(state)``
+        is called after every step, e.g. to draw it.
+        """
+        state = engine.new_game(self.board, direction=self.direction, seed=self.seed, bombs=self.bombs)
+        interval = None if speed is None else 1.0 / (self.tick_rate * speed)
+        next_tick = time.perf_counter()
+        while state.alive and state.tick < self.final_tick:
+            engine.step(state, self.turns.get(state.tick + 1))
+            if on_tick is not None:
+                on_tick(state)
+            if interval is not None:
+                next_tick += interval
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        return state
+
+    def verify(self):
+        """Whether replaying reproduces the recorded tick count and score."""
+        state = self.play()
+        return state.tick == self.final_tick and state.score == self.score
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play back a recorded game")
+    parser.add_argument("path")
+    parser.add_argument("--speed", type=float, default=None, help="multiple of real time (default: as fast as possible)")
+    parser.add_argument("--verify", action="store_true", help="check the recorded score and exit")
+    args = parser.parse_args()
+
+    replay = Replay.load(args.path)
+    if args.verify:
+        ok = replay.verify()
+        print(f"{args.path}: {'ok' if ok else 'MISMATCH'} (score {replay.score}, {replay.final_tick} ticks)")
+        raise SystemExit(0 if ok else 1)
+
+    def report(state):
+        if state.tick % replay.tick_rate == 0 or not state.alive:
+            print(f"tick {state.tick:>6}  score {state.score:>5}  length {len(state.snake):>4}", end="\r")
+
+    start = time.perf_counter()
+    state = replay.play(args.speed, report if args.speed else None)
+    elapsed = time.perf_counter() - start
+    print(f"\nfinal score {state.score} after {state.tick} ticks in {elapsed:.3f}s "
+          f"({state.tick / max(elapsed, 1e-9):,.0f} ticks/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,119 @@
+import os
+import threading
+from collections import deque
+
+import numpy as np
 import pygame
 
-class SoundManager:
-    def __init__(self):
-        pygame.mixer.init()
-        self.eat_sound = pygame.mixer.Sound("assets/sounds/eat.wav")
-        self.gameover_sound = pygame.mixer.Sound("assets/sounds/gameover.wav")
-        self.move_sound = pygame.mixer.Sound("assets/sounds/move.wav")
+SOUNDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "sounds")
+
+# File names tried for each effect, and the tone (Hz, ms) used when none exist
+SOUND_FILES = {
+    "eat": ("eat.wav",),
+    "gameover": ("gameover.wav", "game_over.wav"),
+    "move": ("move.wav",),
+    "powerup": ("powerup.wav",),
+    "bomb": ("bomb.wav",),
+    "crash": ("crash.wav",),
+}
+TONES = {
+    "eat": (1000, 100),
+    "gameover": (300, 300),
+    "move": (600, 20),
+    "powerup": (1500, 150),
+    "bomb": (1200, 40),
+    "crash": (1000, 100),
+}
+SAMPLE_TYPES = {8: np.uint8, -8: np.int8, 16: np.uint16, -16: np.int16, 32: np.float32}
+
+
+def make_tone(freq, duration_ms, volume=0.5):
+    """A sine tone in the mixer's own format, with short fades against clicks."""
+    rate, size, channels = pygame.mixer.get_init()
+    n = max(1, rate * duration_ms // 1000)
+    wave = np.sin(2 * np.pi * freq * np.arange(n) / rate) * volume
+    fade = min(n // 2, rate // 200)
+    if fade:
+        ramp = np.linspace(0.0, 1.0, fade)
+        wave[:fade] *= ramp
+        wave[-fade:] *= ramp[::-1]
+    dtype = SAMPLE_TYPES.get(size, np.int16)
+    if dtype is not np.float32:
+        info = np.iinfo(dtype)
+        wave = wave * (info.max - info.min) / 2 + (info.max + info.min) / 2
+    samples = np.repeat(wave.astype(dtype)[:, None], channels, axis=1)
+    return pygame.mixer.Sound(buffer=samples.tobytes())
+
+
+class AudioService:
+    """Every sound effect, decoded once and played fire-and-forget.
+
+    Each effect in SOUND_FILES is loaded from ``sounds_dir`` or, if no file
+    is there, synthesized from TONES, so play() never fails on a missing
+    asset.  play() only appends the name to a deque; a worker thread hands
+    it to one of ``channels`` reserved mixer channels, stealing the oldest
+    one when all are busy.  Without a working mixer play() does nothing.
+    """
+
+    def __init__(self, sounds_dir=SOUNDS_DIR, channels=8):
+        self.sounds = {}
+        self.channels = []
+        self.pending = deque()
+        self.wake = threading.Event()
+        self.next_channel = 0
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+        except pygame.error as e:
+            print(f"Audio disabled: {e}")
+            return
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), channels))
+        pygame.mixer.set_reserved(channels)
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        for name in SOUND_FILES:
+            self.sounds[name] = self.load(sounds_dir, name)
+        threading.Thread(target=self.run, name="audio", daemon=True).start()
+
+    def load(self, sounds_dir, name):
+        for filename in SOUND_FILES[name]:
+            path = os.path.join(sounds_dir, filename)
+            if os.path.exists(path):
+                try:
+                    return pygame.mixer.Sound(path)
+                except pygame.error as e:
+                    print(f"Error loading sound {filename}: {e}")
+        return make_tone(*TONES[name])
+
+    def play(self, name):
+        if self.channels:
+            self.pending.append(name)
+            self.wake.set()
+
+    def run(self):
+        while True:
+            self.wake.wait()
+            self.wake.clear()
+            while self.pending:
+                sound = self.sounds.get(self.pending.popleft())
+                if sound is not None:
+                    self.channel().play(sound)
+
+    def channel(self):
+        for channel in self.channels:
+            if not channel.get_busy():
+                return channel
+        # All busy: cut off the one that was started longest ago
+        channel = self.channels[self.next_channel]
+        self.next_channel = (self.next_channel + 1) % len(self.channels)
+        return channel
+
 
+class SoundManager(AudioService):
     def play_eat_sound(self):
-        self.eat_sound.play()
+        self.play("eat")
 
     def play_gameover_sound(self):
-        self.gameover_sound.play()
+        self.play("gameover")
 
     def play_move_sound(self):
-        self.move_sound.play()
\ No newline at end of file
+        self.play("move")
@@ -1,76 +1,169 @@
 import os
+import numpy as np
 import pygame
 import random
 import math
 from enum import Enum
 from config import *
+from particles import ParticlePool
 
+# --- Frame atlas ---
+def _shade(color, factor):
+    return tuple(int(c * factor) for c in color[:3])
+
+def _tint(color, amount):
+    return tuple(int(c + (255 - c) * amount) for c in color[:3])
+
+def _circles(size, colors):
+    frames = []
+    for color in colors:
+        frame = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.circle(frame, color, (size // 2, size // 2), size // 2)
+        frames.append(frame)
+    return frames
+
+def _squares(size, colors):
+    frames = []
+    for color in colors:
+        frame = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.rect(frame, color, (0, 0, size, size))
+        frames.append(frame)
+    return frames
+
+# Frames of each kind from the theme's colors (the default theme gives the
+# original green snake and red apple); simple shapes for now - replace with
+# actual sprites
+FRAME_PAINTERS = {
+    "head": lambda size, theme: _circles(size, (theme["snake"], _tint(theme["snake"], 200 / 255))),
+    "body": lambda size, theme: _squares(size, (_shade(theme["snake"], 200 / 255), _shade(theme["snake"], 150 / 255))),
+    "food": lambda size, theme: _circles(size, (theme["food"], _tint(theme["food"], 100 / 255))),
+}
+
+class FrameAtlas:
+    """Every animation frame, drawn once per (kind, size, theme) and shared
+
+    Sprites hold an index range into ``frames`` instead of surfaces of
+    their own, so a long snake or many apples cost no surface memory and
+    creating one never draws anything.
+    """
+
+    def __init__(self):
+        self.frames = []
+        self.ranges = {}
+
+    def lookup(self, kind, size=GRID_SIZE, theme=None):
+        """(first, count) of the frames for ``kind``, drawing them on first use"""
+        theme = theme or load_theme('default')
+        key = (kind, size, tuple(theme["snake"]), tuple(theme["food"]))
+        found = self.ranges.get(key)
+        if found is None:
+            frames = FRAME_PAINTERS[kind](size, theme)
+            found = self.ranges[key] = (len(self.frames), len(frames))
+            self.frames.extend(frames)
+        return found
+
+    def frame(self, kind, phase=0, size=GRID_SIZE, theme=None):
+        first, count = self.lookup(kind, size, theme)
+        return self.frames[first + phase % count]
+
+atlas = FrameAtlas()
+
+# --- Sprites ---
 class AnimatedSprite(pygame.sprite.Sprite):
-    def __init__(self, images, x, y, frame_delay=5):
+    """A sprite showing a range of atlas frames
+
+    All sprites animate off one shared tick count, advanced once per game
+    tick with AnimatedSprite.advance(), so they keep no counters of their
+    own and sprites with the same frame_delay stay in step.
+    """
+    ticks = 0
+
+    def __init__(self, kind, x, y, frame_delay=5, theme=None):
         super().__init__()
-        self.images = images
-        self.frame_index = 0
+        self.first, self.count = atlas.lookup(kind, GRID_SIZE, theme)
         self.frame_delay = frame_delay
-        self.frame_counter = 0
-        self.image = self.images[0]
-        self.rect = self.image.get_rect()
-        self.rect.topleft = (x, y)
-        self.animation_speed = 1.0
-
-    def update(self):
-        self.frame_counter += self.animation_speed
-        if self.frame_counter >= self.frame_delay:
-            self.frame_counter = 0
-            self.frame_index = (self.frame_index + 1) % len(self.images)
-            self.image = self.images[self.frame_index]
+        self.rect = pygame.Rect(x, y, GRID_SIZE, GRID_SIZE)
+
+    @classmethod
+    def advance(cls):
+        AnimatedSprite.ticks += 1
+
+    @property
+    def frame_index(self):
+        return AnimatedSprite.ticks // self.frame_delay % self.count
+
+    @property
+    def image(self):
+        return atlas.frames[self.first + self.frame_index]
 
 class SnakeHead(AnimatedSprite):
-    def __init__(self, x, y):
-        # Load snake head images for different directions
-        head_images = [
-            pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA),
-            pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA)
-        ]
-        # Simple colored heads for now - replace with actual sprites
-        pygame.draw.circle(head_images[0], GREEN, (GRID_SIZE//2, GRID_SIZE//2), GRID_SIZE//2)
-        pygame.draw.circle(head_images[1], (200, 255, 200), (GRID_SIZE//2, GRID_SIZE//2), GRID_SIZE//2)
-        
-        super().__init__(head_images, x * GRID_SIZE, y * GRID_SIZE, frame_delay=10)
+    def __init__(self, x, y, theme=None):
+        super().__init__("head", x * GRID_SIZE, y * GRID_SIZE, frame_delay=10, theme=theme)
         self.direction = Direction.RIGHT
-        self.next_direction = Direction.RIGHT
         self.last_position = (x, y)
         self.growing = False
 
-    def update_direction(self, new_direction):
-        # Prevent 180-degree turns
-        if (new_direction == Direction.UP and self.direction != Direction.DOWN) or \
-           (new_direction == Direction.DOWN and self.direction != Direction.UP) or \
-           (new_direction == Direction.LEFT and self.direction != Direction.RIGHT) or \
-           (new_direction == Direction.RIGHT and self.direction != Direction.LEFT):
-            self.next_direction = new_direction
-
-    def update(self):
-        super().update()
+    def update_position(self, new_x, new_y):
+        # Movement rules live in engine.step(); the head only follows
         self.last_position = (self.rect.x // GRID_SIZE, self.rect.y // GRID_SIZE)
-        self.direction = self.next_direction
-        
-        # Move the head
-        dx, dy = self.direction.value
-        self.rect.x = (self.rect.x + dx * GRID_SIZE) % WIDTH
-        self.rect.y = (self.rect.y + dy * GRID_SIZE) % HEIGHT
+        self.rect.x = new_x * GRID_SIZE
+        self.rect.y = new_y * GRID_SIZE
+
+class SnakeBodyBuffer:
+    """The snake's grid cells, head first, in a preallocated ring
+
+    Moving is push_head() plus pop_tail() and growing is push_head() alone,
+    so a tick costs the same at any length, and nothing is allocated after
+    construction: the whole body is ``capacity`` pairs of int16.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.xs = np.zeros(capacity, dtype=np.int16)
+        self.ys = np.zeros(capacity, dtype=np.int16)
+        self.start = 0  # slot of the head
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def reset(self, cells):
+        """Refill with ``cells``, head first"""
+        self.start = self.length = 0
+        for x, y in reversed(list(cells)):
+            self.push_head(x, y)
+
+    def push_head(self, x, y):
+        if self.length == self.capacity:
+            raise IndexError("snake body buffer is full")
+        self.start = (self.start - 1) % self.capacity
+        self.xs[self.start] = x
+        self.ys[self.start] = y
+        self.length += 1
+
+    def pop_tail(self):
+        self.length -= 1
+        i = (self.start + self.length) % self.capacity
+        return int(self.xs[i]), int(self.ys[i])
+
+    @property
+    def head(self):
+        return int(self.xs[self.start]), int(self.ys[self.start])
+
+    def cells(self):
+        """(xs, ys) arrays of every cell, head first"""
+        end = self.start + self.length
+        if end <= self.capacity:
+            return self.xs[self.start:end], self.ys[self.start:end]
+        end -= self.capacity
+        return (np.concatenate((self.xs[self.start:], self.xs[:end])),
+                np.concatenate((self.ys[self.start:], self.ys[:end])))
 
 class SnakeBody(AnimatedSprite):
-    def __init__(self, x, y):
-        # Load snake body images
-        body_images = [
-            pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA),
-            pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA)
-        ]
-        # Simple colored bodies for now - replace with actual sprites
-        pygame.draw.rect(body_images[0], (0, 200, 0), (0, 0, GRID_SIZE, GRID_SIZE))
-        pygame.draw.rect(body_images[1], (0, 150, 0), (0, 0, GRID_SIZE, GRID_SIZE))
-        
-        super().__init__(body_images, x * GRID_SIZE, y * GRID_SIZE, frame_delay=15)
+    FRAME_DELAY = 15
+
+    def __init__(self, x, y, theme=None):
+        super().__init__("body", x * GRID_SIZE, y * GRID_SIZE, frame_delay=self.FRAME_DELAY, theme=theme)
         self.last_position = (x, y)
 
     def update_position(self, new_x, new_y):
@@ -79,17 +172,8 @@ class SnakeBody(AnimatedSprite):
         self.rect.y = new_y * GRID_SIZE
 
 class Food(AnimatedSprite):
-    def __init__(self, x, y):
-        # Load food images for animation
-        food_images = [
-            pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA),
-            pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA)
-        ]
-        # Simple colored food for now - replace with actual sprites
-        pygame.draw.circle(food_images[0], RED, (GRID_SIZE//2, GRID_SIZE//2), GRID_SIZE//2)
-        pygame.draw.circle(food_images[1], (255, 100, 100), (GRID_SIZE//2, GRID_SIZE//2), GRID_SIZE//2)
-        
-        super().__init__(food_images, x * GRID_SIZE, y * GRID_SIZE, frame_delay=20)
+    def __init__(self, x, y, theme=None):
+        super().__init__("food", x * GRID_SIZE, y * GRID_SIZE, frame_delay=20, theme=theme)
         self.value = 10
         self.spawn_time = pygame.time.get_ticks()
         self.lifespan = 15000  # 15 seconds
@@ -97,68 +181,9 @@ class Food(AnimatedSprite):
     def should_despawn(self):
         return pygame.time.get_ticks() - self.spawn_time > self.lifespan
 
-class Particle(pygame.sprite.Sprite):
-    def __init__(self, x, y, color, velocity, lifetime, size=3):
-        super().__init__()
-        self.image = pygame.Surface((size*2, size*2), pygame.SRCALPHA)
-        pygame.draw.circle(self.image, color, (size, size), size)
-        self.rect = self.image.get_rect(center=(x, y))
-        self.velocity = velocity
-        self.lifetime = lifetime
-        self.alpha = 255
-        self.size = size
-
-    def update(self):
-        self.rect.x += self.velocity[0]
-        self.rect.y += self.velocity[1]
-        self.lifetime -= 1
-        self.alpha = max(0, self.alpha - 10)
-        
-        if self.alpha > 0:
-            self.image.set_alpha(self.alpha)
-class ParticleSystem:
-    def __init__(self):
-        self.particles = []
-    
+class ParticleSystem(ParticlePool):
+    """Burst effects for SnakeGame on top of the shared particle pool"""
+
     def create_particles(self, x, y, color, count=10, size=3, speed=2):
         """Create a burst of particles at the given position"""
-        for _ in range(count):
-            angle = random.uniform(0, 2 * math.pi)
-            velocity = [
-                math.cos(angle) * speed * random.uniform(0.5, 1.5),
-                math.sin(angle) * speed * random.uniform(0.5, 1.5)
-            ]
-            lifetime = random.randint(20, 40)
-            self.particles.append({
-                'x': x, 'y': y,
-                'vx': velocity[0], 'vy': velocity[1],
-                'life': lifetime,
-                'color': color,
-                'size': size
-            })
-    
-    def update(self):
-        """Update all particles"""
-        for p in self.particles[:]:
-            p['x'] += p['vx']
-            p['y'] += p['vy']
-            p['life'] -= 1
-            
-            # Remove dead particles
-            if p['life'] <= 0:
-                self.particles.remove(p)
-    
-    def draw(self, surface):
-        """Draw all particles"""
-        for p in self.particles:
-            alpha = min(255, p['life'] * 10)  # Fade out effect
-            color = (*p['color'][:3], alpha) if len(p['color']) > 3 else p['color']
-            
-            # Create a surface with per-pixel alpha
-            s = pygame.Surface((p['size']*2, p['size']*2), pygame.SRCALPHA)
-            pygame.draw.circle(s, color, (p['size'], p['size']), p['size'])
-            surface.blit(s, (int(p['x'] - p['size']), int(p['y'] - p['size'])))
-    
-    def clear(self):
-        """Remove all particles"""
-        self.particles.clear()
+        self.emit(x, y, color, count, speed=(speed * 0.5, speed * 1.5), life=(20, 40), size=size)
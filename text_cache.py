@@ -0,0 +1,60 @@
+import pygame
+from collections import OrderedDict
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (font, text, color).
+
+    Labels that change every few frames (score, length, timers, the FPS
+    counter) go through render_number(): the text up to the first digit is
+    cached whole and the rest is assembled from cached single glyphs, so a
+    new score never rasterizes a whole string again.
+    """
+
+    def __init__(self, max_size=512):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+
+    def _get(self, key):
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+        return surface
+
+    def _put(self, key, surface):
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def render(self, font, text, color):
+        """Cached equivalent of font.render(text, True, color)."""
+        key = (font, text, color)
+        surface = self._get(key)
+        if surface is None:
+            surface = self._put(key, font.render(text, True, color))
+        return surface
+
+    def render_number(self, font, text, color):
+        """Render e.g. "Score: 120" from a cached prefix plus digit glyphs."""
+        key = (font, text, color, "composed")
+        surface = self._get(key)
+        if surface is not None:
+            return surface
+        split = next((i for i, ch in enumerate(text) if ch.isdigit()), len(text))
+        if split == len(text):
+            return self.render(font, text, color)
+        pieces = [self.render(font, text[:split], color)] if split else []
+        pieces.extend(self.render(font, ch, color) for ch in text[split:])
+        width = sum(piece.get_width() for piece in pieces)
+        height = max(piece.get_height() for piece in pieces)
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        x = 0
+        for piece in pieces:
+            # Pieces never overlap, so MAX onto the empty surface is a plain
+            # copy that keeps the glyphs' own alpha instead of blending it
+            surface.blit(piece, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            x += piece.get_width()
+        return self._put(key, surface)
+
+    def clear(self):
+        self.surfaces.clear()
@@ -0,0 +1,57 @@
+from collections import deque
+
+class FixedTimestep:
+    """Fixed-rate simulation ticks driven from a variable-rate render loop.
+
+    Each frame, advance(now) adds the elapsed time to an accumulator and
+    returns how many whole ticks are due; ``alpha`` is how far we already are
+    into the next tick, for drawing positions between the last two ticks.
+    The gaps between ticks are kept so the loop can report its jitter.
+    """
+
+    def __init__(self, rate, max_steps=5, window=120):
+        self.max_steps = max_steps
+        self.intervals = deque(maxlen=window)
+        self.set_rate(rate)
+        self.reset()
+
+    def set_rate(self, rate):
+        self.step_ms = 1000.0 / rate
+
+    def reset(self, now=None):
+        """Start counting from ``now``, e.g. after a pause or a blocking screen."""
+        self.last = now
+        self.accumulator = 0.0
+        self.last_tick_time = None
+
+    def advance(self, now):
+        if self.last is None:
+            self.last = now
+        self.accumulator += now - self.last
+        self.last = now
+        steps = int(self.accumulator // self.step_ms)
+        if steps > self.max_steps:
+            # Too far behind (window drag, debugger): drop the backlog rather
+            # than fast-forwarding the game
+            steps = self.max_steps
+            self.accumulator %= self.step_ms
+        else:
+            self.accumulator -= steps * self.step_ms
+        if steps:
+            if self.last_tick_time is not None:
+                self.intervals.append(now - self.last_tick_time)
+                # Catch-up ticks in the same frame run back to back
+                self.intervals.extend([0.0] * (steps - 1))
+            self.last_tick_time = now
+        return steps
+
+    @property
+    def alpha(self):
+        return min(1.0, self.accumulator / self.step_ms)
+
+    def jitter(self):
+        """Mean and worst deviation (ms) of recent tick gaps from the nominal step."""
+        if not self.intervals:
+            return 0.0, 0.0
+        deviations = [abs(gap - self.step_ms) for gap in self.intervals]
+        return sum(deviations) / len(deviations), max(deviations)